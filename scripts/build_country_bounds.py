@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Pre-extract country bounding boxes from Natural Earth into data/country_bounds.json.
+The runtime bbox lookup then only needs json instead of GeoPandas.
+"""
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import argparse
+import json
+
+from src.analysis.country_bounds import NATURAL_EARTH_URL, COUNTRY_BOUNDS_PATH, build_bounds_table
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build the country bounding-box table used by the CISI and map tools"
+    )
+    parser.add_argument(
+        "--source",
+        default=NATURAL_EARTH_URL,
+        help="Path or URL of the Natural Earth admin-0 countries dataset"
+    )
+    parser.add_argument(
+        "--output",
+        default=str(COUNTRY_BOUNDS_PATH),
+        help="Output JSON file"
+    )
+
+    args = parser.parse_args()
+
+    print(f"Reading countries from {args.source}...")
+    table = build_bounds_table(args.source)
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(table, f, sort_keys=True)
+
+    print(f"✅ Wrote {len(table)} country aliases to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -19,7 +19,7 @@ def main():
     
     # Fetch Wikipedia articles
     scraper = WikipediaCountryScraper()
-    df = scraper.fetch_all_countries(delay=0.5)
+    df = scraper.fetch_all_countries()
     
     if len(df) == 0:
         print("❌ No data fetched!")
@@ -5,8 +5,8 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
-import pandas as pd
 from langchain_core.documents import Document
+from src.data_ingestion.loader import DataLoader
 from src.data_ingestion.vector_store import VectorStoreManager
 from src.config import Config
 import logging
@@ -20,7 +20,7 @@ def ingest_wikipedia():
     # Load CSV
     csv_path = "data/datasets/wikipedia/wikipedia_countries.csv"
     logger.info(f"Loading {csv_path}")
-    df = pd.read_csv(csv_path)
+    df = DataLoader.load_csv_snapshot(Path(csv_path))
     
     # Create documents with full_text as main content
     documents = []
@@ -14,7 +14,7 @@ from src.config import Config
 from src.data_ingestion.vector_store import VectorStoreManager
 
 # Import the indicator extraction function
-from list_indicators import extract_indicators_from_un_data, extract_wikipedia_topics
+from scripts.list_indicators import extract_indicators_from_un_data, extract_wikipedia_topics
 
 
 PMESII_DOMAINS = {
@@ -7,6 +7,7 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from src.data_ingestion import DataLoader, DocumentProcessor
+from src.data_ingestion.processor import mask_to_names
 
 def preview_metadata(file_path: str, max_docs: int = 3):
     """Preview metadata for a dataset"""
@@ -85,7 +86,9 @@ def preview_metadata(file_path: str, max_docs: int = 3):
             print(f"  {doc.page_content[:200]}...")
             print(f"\n🏷️  Metadata:")
             for key, value in sorted(doc.metadata.items()):
-                if key not in ['source_path', 'source_file']:  # Skip file paths
+                if key == 'content_hints_mask':
+                    print(f"  • content_hints: {','.join(mask_to_names(value))}")
+                elif key not in ['source_path', 'source_file']:  # Skip file paths
                     print(f"  • {key}: {str(value)[:100]}")
             print()
         
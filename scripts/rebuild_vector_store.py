@@ -247,7 +247,7 @@ def rebuild_vector_store():
     if success_count > 0:
         print("\n🎉 Vector store is ready!")
         print("\nNext steps:")
-        print("  1. Start API: python src/api/server.py")
+        print("  1. Start API: python -m src.api.server")
         print("  2. Start dashboard: streamlit run src/dashboard/app.py")
         print("  3. Test queries: python test_chat.py")
     else:
@@ -7,13 +7,14 @@ import rasterio
 from rasterio.mask import mask
 from scipy import ndimage
 from scipy.signal import find_peaks
-import geopandas as gpd
 from shapely.geometry import Point, box
 from typing import Dict, List, Tuple, Optional
 import logging
 from pathlib import Path
 import plotly.graph_objects as go
 
+from .country_bounds import get_country_bounds
+
 logger = logging.getLogger(__name__)
 
 
@@ -33,7 +34,7 @@ class CISIAnalyzer:
         logger.info(f"✅ CISI Analyzer initialized with raster: {self.raster_path}")
     
     def get_country_bounds(self, country_name: str) -> Optional[Tuple[float, float, float, float]]:
-        """Get bounding box for a country using Natural Earth data.
+        """Get bounding box for a country from the pre-extracted Natural Earth table.
         
         Args:
             country_name: Name of the country
@@ -41,28 +42,10 @@ class CISIAnalyzer:
         Returns:
             Tuple of (minx, miny, maxx, maxy) or None if not found
         """
-        try:
-            # Load Natural Earth country boundaries directly from URL
-            url = "https://naciscdn.org/naturalearth/110m/cultural/ne_110m_admin_0_countries.zip"
-            world = gpd.read_file(url)
-            
-            # Try multiple name columns that might contain the country name
-            country = world[
-                (world['NAME'].str.lower() == country_name.lower()) |
-                (world['NAME_LONG'].str.lower() == country_name.lower()) |
-                (world['ADMIN'].str.lower() == country_name.lower())
-            ]
-            
-            if country.empty:
-                logger.warning(f"Country '{country_name}' not found in Natural Earth dataset")
-                return None
-            
-            bounds = country.total_bounds  # (minx, miny, maxx, maxy)
+        bounds = get_country_bounds(country_name)
+        if bounds:
             logger.info(f"Found bounds for {country_name}: {bounds}")
-            return tuple(bounds)
-        except Exception as e:
-            logger.error(f"Error getting country bounds: {e}")
-            return None
+        return bounds
     
     def compute_zonal_statistics(
         self, 
@@ -0,0 +1,90 @@
+"""
+Country bounding-box lookup backed by a pre-extracted JSON table.
+Avoids loading GeoPandas and the Natural Earth shapefile on the request path.
+"""
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+NATURAL_EARTH_URL = "https://naciscdn.org/naturalearth/110m/cultural/ne_110m_admin_0_countries.zip"
+COUNTRY_BOUNDS_PATH = Path("./data/country_bounds.json")
+
+# Name columns in Natural Earth that may hold the country name
+NAME_COLUMNS = ("NAME", "NAME_LONG", "ADMIN")
+
+# Module-level cache of the loaded table (lower-cased name -> [minx, miny, maxx, maxy])
+_BOUNDS_TABLE: Optional[Dict[str, List[float]]] = None
+
+
+def build_bounds_table(source: str = NATURAL_EARTH_URL) -> Dict[str, List[float]]:
+    """Extract country bounding boxes from a Natural Earth countries layer.
+
+    Args:
+        source: Path or URL of the Natural Earth admin-0 countries dataset
+
+    Returns:
+        Dictionary mapping lower-cased NAME/NAME_LONG/ADMIN aliases to
+        [minx, miny, maxx, maxy]
+    """
+    import geopandas as gpd
+
+    world = gpd.read_file(source)
+    table: Dict[str, List[float]] = {}
+
+    for row in world.itertuples(index=False):
+        minx, miny, maxx, maxy = row.geometry.bounds
+        for column in NAME_COLUMNS:
+            name = getattr(row, column, None)
+            if not isinstance(name, str) or not name:
+                continue
+            key = name.lower()
+            if key in table:
+                # Same alias on several features: keep the union, like total_bounds
+                prev = table[key]
+                table[key] = [min(prev[0], minx), min(prev[1], miny), max(prev[2], maxx), max(prev[3], maxy)]
+            else:
+                table[key] = [minx, miny, maxx, maxy]
+
+    return table
+
+
+def _load_bounds_table() -> Dict[str, List[float]]:
+    """Load the bounds table once per process."""
+    global _BOUNDS_TABLE
+    if _BOUNDS_TABLE is None:
+        if COUNTRY_BOUNDS_PATH.exists():
+            with open(COUNTRY_BOUNDS_PATH, "r", encoding="utf-8") as f:
+                _BOUNDS_TABLE = json.load(f)
+            logger.info(f"Loaded {len(_BOUNDS_TABLE)} country bounds from {COUNTRY_BOUNDS_PATH}")
+        else:
+            logger.warning(
+                f"{COUNTRY_BOUNDS_PATH} not found, falling back to Natural Earth download. "
+                f"Run scripts/build_country_bounds.py to generate it."
+            )
+            _BOUNDS_TABLE = build_bounds_table()
+    return _BOUNDS_TABLE
+
+
+def get_country_bounds(country_name: str) -> Optional[Tuple[float, float, float, float]]:
+    """Get the bounding box for a country.
+
+    Args:
+        country_name: Name of the country
+
+    Returns:
+        Tuple of (minx, miny, maxx, maxy) or None if not found
+    """
+    try:
+        bounds = _load_bounds_table().get(country_name.lower())
+    except Exception as e:
+        logger.error(f"Error getting country bounds: {e}")
+        return None
+
+    if bounds is None:
+        logger.warning(f"Country '{country_name}' not found in country bounds table")
+        return None
+
+    return tuple(bounds)
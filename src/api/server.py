@@ -1,50 +1,116 @@
 """
 FastAPI server for country dashboard queries.
 """
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
+from cachetools import TTLCache
+import asyncio
+import functools
+import hashlib
+import json
 import logging
-import sys
+import threading
+import uuid
+import zlib
 from pathlib import Path
 
-# Add parent directory to path
-sys.path.append(str(Path(__file__).parent.parent.parent))
-
 from src.config import Config
-from src.langchain_engine.enhanced_query_engine import EnhancedQueryEngine
+from src.langchain_engine.enhanced_query_engine import EnhancedQueryEngine, QUERY_ERROR_PREFIX, iter_answer_chunks
 from src.data_ingestion import DataLoader, DocumentProcessor, VectorStoreManager
+from src.data_ingestion.processor import batched
 
-# Add imports for PMESII analysis
-import sys
-sys.path.append(str(Path(__file__).parent.parent.parent / "scripts"))
-from list_indicators import extract_indicators_from_un_data
-from pmesii_analysis import group_indicators_by_pmesii, get_domain_summary
+# PMESII analysis helpers
+from scripts.list_indicators import extract_indicators_from_un_data
+from scripts.pmesii_analysis import group_indicators_by_pmesii, get_domain_summary
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+class StreamAwareGZipMiddleware(GZipMiddleware):
+    """GZip responses, except on server-sent event routes where it would buffer the stream."""
+    
+    uncompressed_paths = {"/query/stream"}
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in self.uncompressed_paths:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="GeoChain Country Dashboard API",
     description="API for querying country information using LangChain RAG",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson serialises the nested summary/PMESII payloads much faster than json
+    default_response_class=ORJSONResponse
 )
 
-# CORS middleware
+# CORS middleware; browsers may cache preflight responses for a day
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=Config.CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type", "authorization"],
+    max_age=86400,
 )
 
+# Compress JSON answers; most are a few KB of text
+app.add_middleware(StreamAwareGZipMiddleware, minimum_size=512)
+
 # Initialize query engine
 query_engine = None
 
+# Shared by the query engine, /data/upload and /data/status so the embedding
+# client and vector store are opened once per process
+vector_store_manager: Optional[VectorStoreManager] = None
+
+# Read size for streaming uploads to disk
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+# Documents embedded and indexed per vector-store call during ingestion
+INGEST_BATCH_SIZE = 256
+
+# Ingestion job states by job id; finished jobs expire after a day. Both this table
+# and the vector store uploads write to are per process, hence single-worker uploads
+ingest_jobs: TTLCache = TTLCache(maxsize=1024, ttl=24 * 3600)
+
+# Ingestion jobs share one vector store, so run them one at a time
+_ingest_lock = threading.Lock()
+
+# Snapshot of the vector store document count for /data/status polling
+_doc_count_cache: TTLCache = TTLCache(maxsize=1, ttl=30)
+
+# Recent /query answers, keyed by _answer_cache_key
+_answer_cache: TTLCache = TTLCache(maxsize=Config.QUERY_CACHE_SIZE, ttl=Config.QUERY_CACHE_TTL)
+
+# /query answers still being computed, keyed like _answer_cache (single-flight)
+_inflight_queries: Dict[str, asyncio.Task] = {}
+
+
+def _answer_cache_key(question: str, country: Optional[str]) -> str:
+    """Build the answer cache key from the whitespace-normalised question.
+    
+    Case is preserved because the engine's country extraction is case-sensitive.
+    """
+    normalized = " ".join(question.split())
+    return hashlib.sha256(f"{normalized}|{country or ''}".encode("utf-8")).hexdigest()
+
+
+@functools.lru_cache(maxsize=256)
+def _extract_indicators_cached(country: str) -> frozenset:
+    """Extract UN indicators for a country once; the CSVs are static per deploy."""
+    return frozenset(extract_indicators_from_un_data(country))
+
 
 # Request/Response models
 class QueryRequest(BaseModel):
@@ -77,12 +143,13 @@ class PMESIIRequest(BaseModel):
 @app.on_event("startup")
 async def startup_event():
     """Initialize the application"""
-    global query_engine
+    global query_engine, vector_store_manager
     
     try:
         Config.validate()
-        # Use enhanced query engine with tools
-        query_engine = EnhancedQueryEngine()
+        vector_store_manager = VectorStoreManager()
+        # Use enhanced query engine with tools; it loads the shared vector store
+        query_engine = EnhancedQueryEngine(vector_store_manager=vector_store_manager)
         logger.info("Enhanced Query Engine initialized successfully with decision support and mapping tools")
     except Exception as e:
         logger.error(f"Error initializing query engine: {str(e)}")
@@ -116,12 +183,33 @@ async def query(request: QueryRequest):
     if query_engine is None:
         raise HTTPException(status_code=503, detail="Query engine not initialized")
     
+    cache_key = _answer_cache_key(request.question, request.country)
+    answer = _answer_cache.get(cache_key)
+    if answer is not None:
+        return QueryResponse.model_construct(
+            answer=answer,
+            sources=[],
+            confidence=1.0
+        )
+    
     try:
-        # EnhancedQueryEngine returns a string directly
-        answer = query_engine.query(request.question)
+        # An identical question already in flight is joined rather than re-run.
+        # The work runs in its own task, shielded so that a disconnecting
+        # client does not cancel it for the others waiting on it.
+        task = _inflight_queries.get(cache_key)
+        if task is None:
+            # EnhancedQueryEngine returns a string directly
+            task = asyncio.create_task(query_engine.aquery(request.question))
+            _inflight_queries[cache_key] = task
+            task.add_done_callback(lambda _: _inflight_queries.pop(cache_key, None))
+        answer = await asyncio.shield(task)
+        
+        # The engine reports failures as an answer string; don't cache those
+        if not answer.startswith(QUERY_ERROR_PREFIX):
+            _answer_cache[cache_key] = answer
         
         # Format as QueryResponse
-        return QueryResponse(
+        return QueryResponse.model_construct(
             answer=answer,
             sources=[],
             confidence=1.0
@@ -131,6 +219,45 @@ async def query(request: QueryRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/query/stream")
+async def query_stream(request: QueryRequest):
+    """
+    Query the system and stream progress and the answer as server-sent events.
+    
+    Each event is a JSON object with either a "status" (progress message) or a
+    "delta" (next piece of the answer); the stream ends with {"done": true}.
+    """
+    if query_engine is None:
+        raise HTTPException(status_code=503, detail="Query engine not initialized")
+    
+    cache_key = _answer_cache_key(request.question, request.country)
+    
+    async def event_stream():
+        cached = _answer_cache.get(cache_key)
+        if cached is not None:
+            # Same deltas as a fresh answer, so a map still arrives as its own MAP: delta
+            for delta in iter_answer_chunks(cached):
+                yield f"data: {json.dumps({'delta': delta})}\n\n"
+        else:
+            parts = []
+            async for event in query_engine.astream(request.question):
+                if "delta" in event:
+                    parts.append(event["delta"])
+                yield f"data: {json.dumps(event)}\n\n"
+            
+            answer = "".join(parts)
+            if not answer.startswith(QUERY_ERROR_PREFIX):
+                _answer_cache[cache_key] = answer
+        
+        yield f"data: {json.dumps({'done': True})}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.post("/country/summary")
 async def get_country_summary(request: CountrySummaryRequest):
     """
@@ -140,7 +267,7 @@ async def get_country_summary(request: CountrySummaryRequest):
         raise HTTPException(status_code=503, detail="Query engine not initialized")
     
     try:
-        result = query_engine.get_country_summary(request.country)
+        result = await asyncio.to_thread(query_engine.get_country_summary, request.country)
         return result
     except Exception as e:
         logger.error(f"Summary error: {str(e)}")
@@ -156,7 +283,8 @@ async def compare_countries(request: CompareRequest):
         raise HTTPException(status_code=503, detail="Query engine not initialized")
     
     try:
-        result = query_engine.compare_countries(
+        result = await asyncio.to_thread(
+            query_engine.compare_countries,
             request.country1,
             request.country2,
             request.aspect
@@ -168,16 +296,19 @@ async def compare_countries(request: CompareRequest):
 
 
 @app.post("/country/pmesii")
-async def pmesii_analysis(request: PMESIIRequest):
+def pmesii_analysis(request: PMESIIRequest):
     """
     Perform PMESII domain analysis for a country.
     If domain is specified, returns detailed summary for that domain.
     Otherwise, returns indicators grouped by all domains.
+
+    Declared as a plain ``def`` so FastAPI runs the blocking indicator
+    extraction and LLM calls in its threadpool instead of the event loop.
     """
     try:
         # Extract indicators
-        indicators = extract_indicators_from_un_data(request.country)
-        indicators_list = sorted(list(indicators))
+        # Cached per country; grouping below is memoised by _PMESII_CACHE
+        indicators_list = sorted(_extract_indicators_cached(request.country.strip().lower()))
         
         if not indicators_list:
             return {
@@ -246,72 +377,209 @@ async def pmesii_analysis(request: PMESIIRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _ingest_dataset(job_id: str, file_path: Path) -> None:
+    """Load, chunk and index an uploaded dataset, recording progress in ingest_jobs."""
+    job = ingest_jobs[job_id]
+    
+    try:
+        with _ingest_lock:
+            job["status"] = "processing"
+            
+            data = DataLoader().load_dataset(str(file_path))
+            processor = DocumentProcessor()
+            
+            # Process based on data type; DataFrames yield one document per row lazily
+            if isinstance(data, list):
+                documents = processor.process_json(data)
+            else:  # DataFrame
+                documents = processor.iter_documents(data)
+            
+            job["documents_total"] = len(data)
+            
+            if vector_store_manager.vector_store is None:
+                # Create the store from every document at once, as ingest_data.py does,
+                # so a FAISS IVF index is trained on the whole dataset, not its first batch
+                documents = list(documents)
+                vector_store_manager.create_vector_store(documents)
+                job["documents_count"] = len(documents)
+            else:
+                # Add to the shared vector store batch by batch so progress is visible
+                for batch in batched(documents, INGEST_BATCH_SIZE):
+                    vector_store_manager.add_documents(batch)
+                    job["documents_count"] += len(batch)
+            
+            # The query engine sees the new documents directly, but cached answers
+            # and the document count may be stale now
+            _answer_cache.clear()
+            _doc_count_cache.clear()
+        
+        job["status"] = "completed"
+        logger.info(f"✅ Ingested {job['documents_count']} documents from {file_path.name} (job {job_id})")
+    
+    except Exception as e:
+        logger.error(f"Ingestion error for job {job_id}: {str(e)}", exc_info=True)
+        job["status"] = "failed"
+        job["error"] = str(e)
+
+
+class _UploadWriter:
+    """
+    Write an upload to disk, inflating gzip uploads as they stream in.
+    
+    Inflation is capped at UPLOAD_CHUNK_SIZE of output per step, so memory stays
+    bounded however well a chunk compresses, and the total inflated size is capped
+    at Config.MAX_UPLOAD_DECOMPRESSED_MB. Both methods do blocking I/O and are
+    meant to run in the threadpool.
+    """
+    
+    def __init__(self, f, gzipped: bool):
+        self.f = f
+        self.decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS) if gzipped else None
+        self.max_bytes = Config.MAX_UPLOAD_DECOMPRESSED_MB * 1024 * 1024
+        self.written = 0
+    
+    def _emit(self, data: bytes) -> None:
+        self.written += len(data)
+        if self.written > self.max_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Decompressed upload exceeds {Config.MAX_UPLOAD_DECOMPRESSED_MB} MB"
+            )
+        self.f.write(data)
+    
+    def write(self, chunk: bytes) -> None:
+        """Write one upload chunk."""
+        if self.decompressor is None:
+            self.f.write(chunk)
+            return
+        
+        data = chunk
+        while data:
+            if self.decompressor.eof:
+                # Another gzip member follows; concatenated members are valid gzip
+                self.decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+            self._emit(self.decompressor.decompress(data, UPLOAD_CHUNK_SIZE))
+            data = self.decompressor.unconsumed_tail or self.decompressor.unused_data
+    
+    def close(self) -> None:
+        """Flush the decompressor, rejecting a gzip stream that ended early."""
+        if self.decompressor is None:
+            return
+        self._emit(self.decompressor.flush())
+        if not self.decompressor.eof:
+            raise HTTPException(status_code=400, detail="Truncated gzip upload")
+
+
 @app.post("/data/upload")
-async def upload_dataset(file: UploadFile = File(...)):
+async def upload_dataset(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
     """
-    Upload and process a new dataset.
+    Upload a new dataset and queue it for processing.
+    
+    Returns a job id immediately; poll /data/jobs/{job_id} for progress.
     """
+    if query_engine is None or vector_store_manager is None:
+        raise HTTPException(status_code=503, detail="Query engine not initialized")
+    
+    if Config.API_WORKERS > 1:
+        # Job polling would hit other workers, and each worker would save its own
+        # stale copy of the store over the others' additions
+        raise HTTPException(
+            status_code=409,
+            detail="Uploads need a single API worker (API_WORKERS=1); ingest with `python -m src.ingest_data` instead"
+        )
+    
     try:
         # Save uploaded file
         upload_path = Path(Config.UPLOADS_PATH)
         upload_path.mkdir(parents=True, exist_ok=True)
         
-        file_path = upload_path / file.filename
-        with open(file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
-        
-        # Load and process data
-        loader = DataLoader()
-        processor = DocumentProcessor()
-        vector_store_manager = VectorStoreManager()
-        
-        data = loader.load_dataset(str(file_path))
+        # Clients may gzip the dataset (e.g. data.csv.gz); it is stored decompressed
+        filename = file.filename
+        gzipped = filename.endswith(".gz")
+        if gzipped:
+            filename = filename[:-len(".gz")]
         
-        # Process based on data type
-        if isinstance(data, list):
-            documents = processor.process_json(data)
-        else:  # DataFrame
-            documents = processor.process_dataframe(data)
-        
-        # Add to vector store
-        try:
-            vector_store_manager.load_vector_store()
-            vector_store_manager.add_documents(documents)
-        except:
-            # Create new vector store if doesn't exist
-            vector_store_manager.create_vector_store(documents)
-        
-        # Reload query engine
-        global query_engine
-        query_engine.reload_chain()
-        
-        return {
-            "message": f"Successfully processed {len(documents)} documents from {file.filename}",
-            "filename": file.filename,
-            "documents_count": len(documents)
-        }
+        # Stream to disk in fixed-size chunks so memory stays flat for large files;
+        # disk writes go to the threadpool so they don't stall the event loop
+        file_path = upload_path / filename
+        with open(file_path, "wb") as f:
+            writer = _UploadWriter(f, gzipped)
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await run_in_threadpool(writer.write, chunk)
+            await run_in_threadpool(writer.close)
     
+    except HTTPException:
+        # Rejected upload (too large or truncated); don't leave partial data behind
+        file_path.unlink(missing_ok=True)
+        raise
     except Exception as e:
         logger.error(f"Upload error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+    
+    job_id = uuid.uuid4().hex
+    ingest_jobs[job_id] = {
+        "job_id": job_id,
+        "filename": filename,
+        "status": "queued",
+        "documents_count": 0,
+        "documents_total": None
+    }
+    # Parsing, embedding and indexing run after the response is sent
+    background_tasks.add_task(_ingest_dataset, job_id, file_path)
+    
+    return {
+        "message": f"Queued {filename} for processing",
+        "job_id": job_id,
+        "status": "queued"
+    }
+
+
+@app.get("/data/jobs/{job_id}")
+def get_ingest_job(job_id: str):
+    """
+    Get the status of a dataset ingestion job.
+    """
+    job = ingest_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
+
+
+@app.post("/cache/clear")
+def clear_answer_cache():
+    """
+    Drop cached /query answers so the next identical question is answered afresh.
+    
+    The cache is per process; with several workers only the one serving this request is cleared.
+    """
+    cleared = len(_answer_cache)
+    _answer_cache.clear()
+    return {"cleared": cleared}
 
 
 @app.get("/data/status")
-async def get_data_status():
+def get_data_status():
     """
     Get information about loaded data.
     """
+    if vector_store_manager is None or vector_store_manager.vector_store is None:
+        return {
+            "status": "not_initialized",
+            "message": "Vector store not loaded"
+        }
+    
     try:
-        vector_store_manager = VectorStoreManager()
-        vector_store_manager.load_vector_store()
-        
-        # Get collection stats if using ChromaDB
-        if Config.VECTOR_STORE_TYPE == "chroma":
-            collection = vector_store_manager.vector_store._collection
-            count = collection.count()
-        else:
-            count = "unknown"
+        count = _doc_count_cache.get("count")
+        if count is None:
+            # Get collection stats from ChromaDB, or the FAISS index size
+            if Config.VECTOR_STORE_TYPE == "chroma":
+                collection = vector_store_manager.vector_store._collection
+                count = collection.count()
+            elif Config.VECTOR_STORE_TYPE == "faiss":
+                count = vector_store_manager.vector_store.index.ntotal
+            else:
+                count = "unknown"
+            _doc_count_cache["count"] = count
         
         return {
             "vector_store_type": Config.VECTOR_STORE_TYPE,
@@ -325,11 +593,19 @@ async def get_data_status():
         }
 
 
-if __name__ == "__main__":
+def main():
+    """Run the API server (the geochain-api entrypoint)."""
     import uvicorn
+    # Auto-reload only works with a single process; with several workers
+    # each one runs startup_event and builds its own query engine.
     uvicorn.run(
-        "server:app",
+        "src.api.server:app",
         host=Config.API_HOST,
         port=Config.API_PORT,
-        reload=True
+        workers=Config.API_WORKERS,
+        reload=Config.API_WORKERS == 1
     )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 """
 Configuration settings for the GeoChain application.
 """
+import functools
 import os
+from types import MappingProxyType
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -19,15 +21,45 @@ class Config:
     # Model Configuration
     LLM_MODEL = os.getenv("LLM_MODEL", "anthropic/claude-3.5-sonnet")
     EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "openai/text-embedding-3-small")  # Via OpenRouter
+    # "openrouter" embeds via EMBEDDING_MODEL; "local" runs LOCAL_EMBEDDING_MODEL in-process
+    # (384-dim, no API hop). Switching backend requires rebuilding the vector store.
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openrouter")
+    LOCAL_EMBEDDING_MODEL = os.getenv("LOCAL_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+    # Texts per embedding request (OpenRouter) or encode batch (local)
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "128"))
+    # Embedding requests in flight at once during ingestion (OpenRouter backend only)
+    EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", "8"))
     TEMPERATURE = float(os.getenv("TEMPERATURE", "0.7"))
     
     # Vector Store Configuration
     VECTOR_STORE_TYPE = os.getenv("VECTOR_STORE_TYPE", "chroma")
     VECTOR_STORE_PATH = os.getenv("VECTOR_STORE_PATH", "./data/vector_store")
+    EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "./data/embedding_cache.sqlite")
+    
+    # FAISS index (VECTOR_STORE_TYPE=faiss): "flat" = exact IndexFlatIP, suited up to ~100K docs;
+    # "ivfpq" = IndexIVFPQ, approximate but much faster on larger corpora;
+    # "hnswsq" = IndexHNSWSQ graph over int8 scalar-quantised vectors (4x smaller than flat)
+    FAISS_INDEX_TYPE = os.getenv("FAISS_INDEX_TYPE", "flat")
+    FAISS_NLIST = int(os.getenv("FAISS_NLIST", "4096"))
+    FAISS_PQ_M = int(os.getenv("FAISS_PQ_M", "64"))
+    FAISS_NPROBE = int(os.getenv("FAISS_NPROBE", "16"))
+    FAISS_HNSW_M = int(os.getenv("FAISS_HNSW_M", "32"))
+    FAISS_EF_SEARCH = int(os.getenv("FAISS_EF_SEARCH", "64"))
     
     # API Configuration
     API_HOST = os.getenv("API_HOST", "0.0.0.0")
     API_PORT = int(os.getenv("API_PORT", "8000"))
+    # Number of uvicorn worker processes (falls back to the conventional WEB_CONCURRENCY)
+    API_WORKERS = int(os.getenv("API_WORKERS", os.getenv("WEB_CONCURRENCY", "1")))
+    # Comma-separated browser origins allowed to call the API (default: the Streamlit dashboard)
+    CORS_ORIGINS = [origin.strip() for origin in os.getenv("CORS_ORIGINS", "http://localhost:8501").split(",") if origin.strip()]
+    
+    # Query answer cache (in-process, per worker)
+    QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "1024"))
+    QUERY_CACHE_TTL = int(os.getenv("QUERY_CACHE_TTL", "600"))  # seconds
+    
+    # Largest decompressed size accepted for a gzip upload (guards against decompression bombs)
+    MAX_UPLOAD_DECOMPRESSED_MB = int(os.getenv("MAX_UPLOAD_DECOMPRESSED_MB", "2048"))
     
     # Data paths
     DATASETS_PATH = "./data/datasets"
@@ -41,13 +73,14 @@ class Config:
         return True
     
     @classmethod
+    @functools.lru_cache(maxsize=1)
     def get_llm_config(cls):
-        """Get LLM configuration for OpenRouter"""
-        return {
+        """Get LLM configuration for OpenRouter (built once; read-only mapping)"""
+        return MappingProxyType({
             "api_key": cls.OPENROUTER_API_KEY,
             "base_url": cls.OPENROUTER_BASE_URL,
             "model": cls.LLM_MODEL,
             "temperature": cls.TEMPERATURE,
             "app_name": cls.OPENROUTER_APP_NAME,
             "site_url": cls.OPENROUTER_SITE_URL,
-        }
+        })
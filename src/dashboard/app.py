@@ -3,11 +3,30 @@ Streamlit dashboard for GeoChain - Professional chat interface.
 """
 import streamlit as st
 import requests
-from typing import Dict, Any
+import json
+import socket
+import sqlite3
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Any, Iterator, List, Optional
+from urllib.parse import urlsplit
 
 # API Configuration
 API_URL = "http://localhost:8000"
 
+# Messages kept in the live transcript; older ones drop off so reruns stay cheap
+MAX_CHAT_MESSAGES = 50
+
+# On-disk chat history, so a reloaded page restores its transcript
+CHAT_HISTORY_PATH = Path("./data/chat_history.sqlite")
+
+# Per-render message keys never written to the history (older rows may still hold them)
+UNSTORED_MESSAGE_KEYS = frozenset({"text_part", "html_part", "map_key"})
+
 # User avatar as data URI - uses currentColor to adapt to theme
 USER_AVATAR = "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' fill='none' viewBox='0 0 24 24' stroke-width='1.5' stroke='currentColor'%3E%3Cpath stroke-linecap='round' stroke-linejoin='round' d='M17.982 18.725A7.488 7.488 0 0 0 12 15.75a7.488 7.488 0 0 0-5.982 2.975m11.963 0a9 9 0 1 0-11.963 0m11.963 0A8.966 8.966 0 0 1 12 21a8.966 8.966 0 0 1-5.982-2.275M15 9.75a3 3 0 1 1-6 0 3 3 0 0 1 6 0Z'/%3E%3C/svg%3E"
 
@@ -22,8 +41,10 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS inspired by shadcn/ui - clean, minimal, professional
-st.markdown("""
+# Custom CSS inspired by shadcn/ui - clean, minimal, professional.
+# Streamlit drops elements a rerun does not re-emit, so the style tag has to
+# be written on every run; as a module constant it is at least built once.
+CUSTOM_CSS = """
     <style>
     /* Import Inter font for clean typography */
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
@@ -399,6 +420,14 @@ st.markdown("""
         box-shadow: 0 1px 2px 0 rgb(0 0 0 / 0.05);
     }
     
+    /* Embedded maps */
+    [data-testid="stIFrame"] {
+        border: 1px solid #e4e4e7;
+        border-radius: 0.5rem;
+        overflow: hidden;
+        margin-top: 1rem;
+    }
+    
     /* Hide streamlit branding */
     #MainMenu {visibility: hidden;}
     footer {visibility: hidden;}
@@ -406,231 +435,509 @@ st.markdown("""
     [data-testid="stToolbar"] {visibility: hidden;}
     .stDeployButton {display: none;}
     </style>
-""", unsafe_allow_html=True)
+"""
+st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+
+# Static HTML snippets, built once at import rather than on every rerun
+API_CONNECTED_HTML = """
+<div style='background-color: #f0fdf4; border: 1px solid #86efac; border-radius: 0.375rem; padding: 0.75rem; margin-bottom: 1rem;'>
+    <span style='color: #166534; font-weight: 500; font-size: 0.875rem;'>● API Connected</span>
+</div>
+"""
+
+API_OFFLINE_HTML = """
+<div style='background-color: #fef2f2; border: 1px solid #fca5a5; border-radius: 0.375rem; padding: 0.75rem; margin-bottom: 1rem;'>
+    <span style='color: #991b1b; font-weight: 500; font-size: 0.875rem;'>● API Offline</span>
+</div>
+"""
+
+SIDEBAR_FOOTER_HTML = """
+<div style='text-align: center; color: #71717a; font-size: 0.75rem; margin-top: 2rem;'>
+    <p style='margin: 0;'>AtlasINT</p>
+    <p style='margin: 0.25rem 0 0 0;'>Version 1.0</p>
+</div>
+"""
+
+PAGE_HEADER_HTML = """
+<div style='margin-bottom: 2rem;'>
+    <h1 style='font-size: 2rem; font-weight: 600; color: #09090b; margin-bottom: 0.5rem;'>
+        AtlasINT
+    </h1>
+</div>
+"""
+
+API_DOWN_HTML = """
+<div style='background-color: #fffbeb; border: 1px solid #fde68a; border-radius: 0.5rem; padding: 1rem; margin-bottom: 1rem;'>
+    <p style='color: #92400e; font-weight: 500; margin: 0 0 0.5rem 0;'>⚠️ API Server Not Running</p>
+    <p style='color: #71717a; font-size: 0.875rem; margin: 0;'>Please start the API server to use the chat interface.</p>
+</div>
+"""
+
+EMPTY_STATE_HTML = """
+<div style='text-align: center; padding: 3rem 1rem; color: #71717a;'>
+    <div style='font-size: 3rem; margin-bottom: 1rem;'>💬</div>
+    <h3 style='color: #09090b; font-weight: 600; margin-bottom: 0.5rem;'>Start a Conversation</h3>
+    <p style='font-size: 0.9rem;'>Ask about geopolitical situations, ethnic groups, or request data visualizations.</p>
+    <div style='margin-top: 2rem; text-align: left; max-width: 600px; margin-left: auto; margin-right: auto;'>
+        <p style='font-weight: 500; color: #09090b; margin-bottom: 0.75rem;'>Example queries:</p>
+        <ul style='list-style: none; padding: 0;'>
+            <li style='padding: 0.5rem; margin-bottom: 0.5rem; background-color: #fafafa; border: 1px solid #e4e4e7; border-radius: 0.375rem;'>
+                "Show me a map of ethnic groups in Nigeria"
+            </li>
+            <li style='padding: 0.5rem; margin-bottom: 0.5rem; background-color: #fafafa; border: 1px solid #e4e4e7; border-radius: 0.375rem;'>
+                "What is the political situation in Mali?"
+            </li>
+            <li style='padding: 0.5rem; margin-bottom: 0.5rem; background-color: #fafafa; border: 1px solid #e4e4e7; border-radius: 0.375rem;'>
+                "Analyze ethnic power relations in Ethiopia"
+            </li>
+            <li style='padding: 0.5rem; margin-bottom: 0.5rem; background-color: #fafafa; border: 1px solid #e4e4e7; border-radius: 0.375rem;'>
+                "Show me PMESII analysis for Ukraine"
+            </li>
+        </ul>
+    </div>
+</div>
+"""
+
+# Confidence pill colours as (color, upper bound in percent), checked in order
+CONFIDENCE_COLORS = (("#991b1b", 40), ("#92400e", 70), ("#166534", float("inf")))
+
+# Confidence pill; format with color= and pct=
+CONFIDENCE_TEMPLATE = """
+<div style='margin-top: 0.75rem; padding: 0.5rem; background-color: #fafafa; border-radius: 0.25rem; border-left: 3px solid {color};'>
+    <span style='color: #71717a; font-size: 0.8rem; font-weight: 500;'>Confidence: </span>
+    <span style='color: {color}; font-size: 0.8rem; font-weight: 600;'>{pct:.0f}%</span>
+</div>
+"""
+
+
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    """HTTP session shared across reruns so API connections are kept alive"""
+    session = requests.Session()
+    session.headers["User-Agent"] = "GeoChain-Dashboard"
+    # Pool sized for concurrent browser sessions hitting the same API host.
+    # Retries cover connection hiccups; urllib3 never re-sends POSTs after a read.
+    adapter = HTTPAdapter(
+        pool_connections=8,
+        pool_maxsize=16,
+        max_retries=Retry(total=2, backoff_factor=0.2)
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+@st.cache_resource
+def get_executor() -> ThreadPoolExecutor:
+    """Thread pool shared across reruns for overlapping API calls with rendering"""
+    return ThreadPoolExecutor(max_workers=4)
+
+
+class ChatHistoryStore:
+    """SQLite-backed chat transcripts keyed by chat id.
+    
+    Writes go through a single background thread, so they never block a
+    rerun and are applied in the order they were submitted.
+    """
+    
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, chat_id TEXT NOT NULL, "
+            "role TEXT NOT NULL, content TEXT NOT NULL, meta TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS messages_chat_id ON messages (chat_id)")
+        self._conn.commit()
+        self._writer = ThreadPoolExecutor(max_workers=1)
+    
+    def load(self, chat_id: str, limit: int) -> List[Dict[str, Any]]:
+        """Return the last `limit` messages of a chat, oldest first"""
+        rows = self._writer.submit(
+            lambda: self._conn.execute(
+                "SELECT role, content, meta FROM messages WHERE chat_id = ? ORDER BY id DESC LIMIT ?",
+                (chat_id, limit)
+            ).fetchall()
+        ).result()
+        messages = []
+        for role, content, meta in reversed(rows):
+            extra = {key: value for key, value in json.loads(meta).items() if key not in UNSTORED_MESSAGE_KEYS}
+            messages.append({"role": role, "content": content, **extra})
+        return messages
+    
+    def append(self, chat_id: str, message: Dict[str, Any]) -> None:
+        """Queue a message for writing"""
+        message = dict(message)
+        self._writer.submit(self._insert, chat_id, message)
+    
+    def clear(self, chat_id: str) -> None:
+        """Queue deletion of a chat's messages"""
+        self._writer.submit(self._delete, chat_id)
+    
+    def _insert(self, chat_id: str, message: Dict[str, Any]) -> None:
+        role = message.pop("role")
+        content = str(message.pop("content"))
+        # Map HTML lives in content only; render-time keys are not persisted
+        meta = {key: value for key, value in message.items() if key not in UNSTORED_MESSAGE_KEYS}
+        self._conn.execute(
+            "INSERT INTO messages (chat_id, role, content, meta) VALUES (?, ?, ?, ?)",
+            (chat_id, role, content, json.dumps(meta))
+        )
+        self._conn.commit()
+    
+    def _delete(self, chat_id: str) -> None:
+        self._conn.execute("DELETE FROM messages WHERE chat_id = ?", (chat_id,))
+        self._conn.commit()
+
+
+@st.cache_resource
+def get_history_store() -> ChatHistoryStore:
+    """Chat history store shared by all sessions"""
+    return ChatHistoryStore(CHAT_HISTORY_PATH)
+
 
+def get_chat_id() -> str:
+    """Chat id kept in the URL so a page reload finds the same transcript"""
+    chat_id = st.query_params.get("chat")
+    if not chat_id:
+        chat_id = uuid.uuid4().hex
+        st.query_params["chat"] = chat_id
+    return chat_id
 
+
+def api_port_open(timeout: float = 0.1) -> bool:
+    """Cheap TCP connect to the API host; False means nothing is listening"""
+    url = urlsplit(API_URL)
+    port = url.port or (443 if url.scheme == "https" else 80)
+    try:
+        socket.create_connection((url.hostname, port), timeout=timeout).close()
+        return True
+    except OSError:
+        return False
+
+
+@st.cache_data(ttl=5, show_spinner=False)
 def check_api_health():
-    """Check if API is running"""
+    """Check if API is running (cached briefly so one probe covers a page render)"""
+    # The usual failure is a stopped server; detect it without an HTTP round trip
+    if not api_port_open():
+        return False
+    
     try:
-        response = requests.get(f"{API_URL}/health", timeout=5)
+        response = get_http_session().get(f"{API_URL}/health", timeout=5)
         return response.status_code == 200
     except:
         return False
 
 
-def query_api(question: str) -> Dict[str, Any]:
-    """Send query to API"""
+class QueryError(Exception):
+    """Raised inside the cached query layer so failed queries are not cached"""
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _query_api_cached(question: str) -> Dict[str, Any]:
+    """Send query to API; identical questions within 5 minutes are served locally"""
     try:
-        response = requests.post(
+        response = get_http_session().post(
             f"{API_URL}/query",
             json={"question": question},
             timeout=240  # Increased timeout for CISI analysis
         )
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
-            return {"error": f"API error: {response.status_code}"}
     except Exception as e:
+        raise QueryError(str(e))
+    
+    if response.status_code != 200:
+        raise QueryError(f"API error: {response.status_code}")
+    return response.json()
+
+
+def query_api(question: str) -> Dict[str, Any]:
+    """Send query to API"""
+    try:
+        return _query_api_cached(question)
+    except QueryError as e:
         return {"error": str(e)}
 
 
-def pmesii_analysis_api(country: str, domain: str = None, years: int = None) -> Dict[str, Any]:
-    """Get PMESII analysis from API"""
+def clear_cached_answers() -> bool:
+    """Clear the dashboard's cached API results and the API's answer cache"""
+    st.cache_data.clear()
+    try:
+        response = get_http_session().post(f"{API_URL}/cache/clear", timeout=5)
+        return response.status_code == 200
+    except Exception:
+        return False
+
+
+def stream_query_api(question: str, result: Dict[str, Any], status=None) -> Iterator[str]:
+    """Stream a query answer from the API's server-sent events endpoint.
+    
+    Yields the text of the answer as it arrives. A map payload (MAP: prefix)
+    is not yielded but stored in result["map"]; errors go to result["error"].
+    Progress messages are written to the optional status placeholder.
+    Falls back to the blocking /query endpoint if the API has no stream route.
+    """
     try:
-        payload = {"country": country}
-        if domain:
-            payload["domain"] = domain
-        if years:
-            payload["years"] = years
+        with get_http_session().post(
+            f"{API_URL}/query/stream",
+            json={"question": question},
+            stream=True,
+            timeout=240  # Increased timeout for CISI analysis
+        ) as response:
+            if response.status_code not in (200, 404):
+                result["error"] = f"API error: {response.status_code}"
+                return
+            
+            # An API without the stream route answers 404; use /query instead
+            fallback = response.status_code == 404
+            if not fallback:
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data: "):
+                        continue
+                    event = json.loads(line[len("data: "):])
+                    
+                    if event.get("done"):
+                        break
+                    if "status" in event and status is not None:
+                        status.caption(event["status"])
+                    if "delta" in event:
+                        delta = event["delta"]
+                        if delta.startswith("MAP:"):
+                            result["map"] = delta[len("MAP:"):]
+                        else:
+                            yield delta
+        
+        if fallback:
+            fetched = query_api(question)
+            if "error" in fetched:
+                result["error"] = fetched["error"]
+                return
             
-        response = requests.post(
+            result["confidence"] = fetched.get("confidence", 1.0)
+            result["sources"] = fetched.get("sources", [])
+            text_part, sep, html_content = str(fetched.get("answer", "")).partition("MAP:")
+            if sep:
+                result["map"] = html_content
+            if text_part.strip():
+                yield text_part.strip()
+    except Exception as e:
+        result["error"] = str(e)
+    finally:
+        if status is not None:
+            status.empty()
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _pmesii_analysis_cached(country: str, domain: Optional[str], years: Optional[int]) -> Dict[str, Any]:
+    """Get PMESII analysis from API; identical requests within 10 minutes are served locally"""
+    payload = {"country": country}
+    if domain:
+        payload["domain"] = domain
+    if years:
+        payload["years"] = years
+    
+    try:
+        response = get_http_session().post(
             f"{API_URL}/country/pmesii",
             json=payload,
             timeout=60
         )
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
-            return {"error": f"API error: {response.status_code}"}
     except Exception as e:
+        raise QueryError(str(e))
+    
+    if response.status_code != 200:
+        raise QueryError(f"API error: {response.status_code}")
+    return response.json()
+
+
+def pmesii_analysis_api(country: str, domain: str = None, years: int = None) -> Dict[str, Any]:
+    """Get PMESII analysis from API"""
+    try:
+        return _pmesii_analysis_cached(country, domain, years)
+    except QueryError as e:
         return {"error": str(e)}
 
 
+def source_preview(content: str, limit: int = 300) -> str:
+    """Truncate source content for the sources expander"""
+    return content[:limit] + ("..." if len(content) > limit else "")
+
+
+def render_message(message: Dict[str, Any], show_confidence: bool, show_sources: bool,
+                   include_text: bool = True, map_open: Optional[bool] = None):
+    """Render a chat message body: text, map, and for answers confidence and sources.
+    
+    include_text=False skips the text for a live answer already shown by st.write_stream.
+    With map_open set, the map sits behind a toggle (open by default if True) and
+    its iframe is only created while the toggle is on.
+    """
+    content = message["content"]
+    if not isinstance(content, str):
+        st.write(str(content))
+        return
+    
+    # Maps (both GeoEPR and CISI use the MAP: prefix) are split off at render time,
+    # so the HTML is held once, in content
+    text_part, sep, html_part = content.partition("MAP:")
+    if sep:
+        text_part = text_part.strip()
+    
+    # Display text first if present
+    if include_text and text_part:
+        st.markdown(text_part, unsafe_allow_html=True)
+    
+    # Display map (bordered via the stIFrame CSS rule)
+    if html_part:
+        show_map = True
+        if map_open is not None:
+            map_key = message.setdefault("map_key", uuid.uuid4().hex)
+            show_map = st.toggle("🗺️ Show map", value=map_open, key=f"map_{map_key}")
+        if show_map:
+            st.components.v1.html(html_part, height=600, scrolling=True)
+    
+    # Confidence and sources are off by default; skip both checks in that case
+    if message["role"] != "assistant" or not (show_confidence or show_sources):
+        return
+    
+    # Show confidence if enabled
+    if show_confidence and "confidence" in message:
+        confidence_pct = message['confidence'] * 100
+        if "confidence_color" not in message:
+            message["confidence_color"] = next(
+                color for color, bound in CONFIDENCE_COLORS if confidence_pct < bound
+            )
+        confidence_color = message["confidence_color"]
+        st.markdown(
+            CONFIDENCE_TEMPLATE.format(color=confidence_color, pct=confidence_pct),
+            unsafe_allow_html=True
+        )
+    
+    # Show sources if enabled
+    if show_sources and message.get("sources"):
+        with st.expander("📚 View Sources", expanded=False):
+            for idx, source in enumerate(message["sources"], 1):
+                citation = source.get("citation", "Unknown Source")
+                st.markdown(f"**{idx}. {citation}**")
+                
+                # Show content preview (truncated once when the answer arrived)
+                if "preview" not in source:
+                    source["preview"] = source_preview(source.get("content", ""))
+                if source["preview"]:
+                    st.markdown(f"""
+                        <div style='background-color: #fafafa; padding: 0.75rem; border-radius: 0.25rem; margin: 0.5rem 0; font-size: 0.85rem; color: #52525b;'>
+                            {source["preview"]}
+                        </div>
+                    """, unsafe_allow_html=True)
+                
+                if idx < len(message["sources"]):
+                    st.divider()
+
+
+@st.fragment
+def render_chat_history():
+    """Render the chat transcript with its display toggles.
+    
+    Runs as a fragment, so flipping a toggle reruns only the transcript
+    instead of the whole page.
+    """
+    if not st.session_state.messages:
+        return
+    
+    col_confidence, col_sources = st.columns(2)
+    with col_confidence:
+        show_confidence = st.checkbox("Show confidence scores", key="show_confidence")
+    with col_sources:
+        show_sources = st.checkbox("Show sources", key="show_sources")
+    
+    # Only the most recent map starts open; older ones mount on demand
+    last_map = next(
+        (
+            m for m in reversed(st.session_state.messages)
+            if "MAP:" in str(m["content"])
+        ),
+        None
+    )
+    
+    # Display chat history
+    for message in st.session_state.messages:
+        # Custom avatar icons
+        avatar = USER_AVATAR if message["role"] == "user" else AI_AVATAR
+        
+        with st.chat_message(message["role"], avatar=avatar):
+            render_message(message, show_confidence, show_sources, map_open=message is last_map)
+
+
 def main():
     """Main chat application"""
     
+    # Start the health probe now and read it where the status is rendered
+    api_health = get_executor().submit(check_api_health)
+    
+    # Open and restore the chat history (SQLite) while the probe is in flight
+    chat_id = get_chat_id()
+    history = get_history_store()
+    if st.session_state.get("messages") is None:
+        st.session_state.messages = deque(history.load(chat_id, MAX_CHAT_MESSAGES), maxlen=MAX_CHAT_MESSAGES)
+    
     # Settings in sidebar with professional styling
     with st.sidebar:
         # Header with icon
         st.markdown("### ⚙️ Settings")
         
         # API status with clean indicator
-        api_running = check_api_health()
+        api_running = api_health.result()
         if api_running:
-            st.markdown("""
-                <div style='background-color: #f0fdf4; border: 1px solid #86efac; border-radius: 0.375rem; padding: 0.75rem; margin-bottom: 1rem;'>
-                    <span style='color: #166534; font-weight: 500; font-size: 0.875rem;'>● API Connected</span>
-                </div>
-            """, unsafe_allow_html=True)
+            st.markdown(API_CONNECTED_HTML, unsafe_allow_html=True)
         else:
-            st.markdown("""
-                <div style='background-color: #fef2f2; border: 1px solid #fca5a5; border-radius: 0.375rem; padding: 0.75rem; margin-bottom: 1rem;'>
-                    <span style='color: #991b1b; font-weight: 500; font-size: 0.875rem;'>● API Offline</span>
-                </div>
-            """, unsafe_allow_html=True)
-            st.caption("Start with: `python src/api/server.py`")
-        
-        st.divider()
-        
-        # Chat settings section
-        st.markdown("### Display Options")
-        
-        st.divider()
-        
-        # Chat settings
-        st.subheader("Chat Settings")
-        show_confidence = st.checkbox("Show confidence scores", value=False)
-        show_sources = st.checkbox("Show sources", value=False)
+            st.markdown(API_OFFLINE_HTML, unsafe_allow_html=True)
+            st.caption("Start with: `python -m src.api.server`")
         
         st.divider()
         
         # Actions section
         st.markdown("### Actions")
         if st.button("Clear Chat History", use_container_width=True):
-            st.session_state.messages = []
+            st.session_state.messages = deque(maxlen=MAX_CHAT_MESSAGES)
+            history.clear(chat_id)
             st.rerun()
+        if st.button("Clear Cached Answers", use_container_width=True):
+            if clear_cached_answers():
+                st.rerun()
+            st.warning("Cleared the dashboard cache, but the API's answer cache could not be reached")
         
         st.divider()
         
         # Footer
-        st.markdown("""
-            <div style='text-align: center; color: #71717a; font-size: 0.75rem; margin-top: 2rem;'>
-                <p style='margin: 0;'>AtlasINT</p>
-                <p style='margin: 0.25rem 0 0 0;'>Version 1.0</p>
-            </div>
-        """, unsafe_allow_html=True)
+        st.markdown(SIDEBAR_FOOTER_HTML, unsafe_allow_html=True)
     
     # Main content area
     # Header with professional styling
-    st.markdown("""
-        <div style='margin-bottom: 2rem;'>
-            <h1 style='font-size: 2rem; font-weight: 600; color: #09090b; margin-bottom: 0.5rem;'>
-                AtlasINT
-            </h1>
-        </div>
-    """, unsafe_allow_html=True)
-    
-    # Check API
-    if not check_api_health():
-        st.markdown("""
-            <div style='background-color: #fffbeb; border: 1px solid #fde68a; border-radius: 0.5rem; padding: 1rem; margin-bottom: 1rem;'>
-                <p style='color: #92400e; font-weight: 500; margin: 0 0 0.5rem 0;'>⚠️ API Server Not Running</p>
-                <p style='color: #71717a; font-size: 0.875rem; margin: 0;'>Please start the API server to use the chat interface.</p>
-            </div>
-        """, unsafe_allow_html=True)
-        st.code("python src/api/server.py", language="bash")
+    st.markdown(PAGE_HEADER_HTML, unsafe_allow_html=True)
+    
+    # Check API (reuse the sidebar's probe instead of a second request)
+    if not api_running:
+        st.markdown(API_DOWN_HTML, unsafe_allow_html=True)
+        st.code("python -m src.api.server", language="bash")
         return
     
-    # Initialize chat history
-    if "messages" not in st.session_state:
-        st.session_state.messages = []
+    messages = st.session_state.messages
     
     # Display empty state if no messages
-    if not st.session_state.messages:
-        st.markdown("""
-            <div style='text-align: center; padding: 3rem 1rem; color: #71717a;'>
-                <div style='font-size: 3rem; margin-bottom: 1rem;'>💬</div>
-                <h3 style='color: #09090b; font-weight: 600; margin-bottom: 0.5rem;'>Start a Conversation</h3>
-                <p style='font-size: 0.9rem;'>Ask about geopolitical situations, ethnic groups, or request data visualizations.</p>
-                <div style='margin-top: 2rem; text-align: left; max-width: 600px; margin-left: auto; margin-right: auto;'>
-                    <p style='font-weight: 500; color: #09090b; margin-bottom: 0.75rem;'>Example queries:</p>
-                    <ul style='list-style: none; padding: 0;'>
-                        <li style='padding: 0.5rem; margin-bottom: 0.5rem; background-color: #fafafa; border: 1px solid #e4e4e7; border-radius: 0.375rem;'>
-                            "Show me a map of ethnic groups in Nigeria"
-                        </li>
-                        <li style='padding: 0.5rem; margin-bottom: 0.5rem; background-color: #fafafa; border: 1px solid #e4e4e7; border-radius: 0.375rem;'>
-                            "What is the political situation in Mali?"
-                        </li>
-                        <li style='padding: 0.5rem; margin-bottom: 0.5rem; background-color: #fafafa; border: 1px solid #e4e4e7; border-radius: 0.375rem;'>
-                            "Analyze ethnic power relations in Ethiopia"
-                        </li>
-                        <li style='padding: 0.5rem; margin-bottom: 0.5rem; background-color: #fafafa; border: 1px solid #e4e4e7; border-radius: 0.375rem;'>
-                            "Show me PMESII analysis for Ukraine"
-                        </li>
-                    </ul>
-                </div>
-            </div>
-        """, unsafe_allow_html=True)
+    if not messages:
+        st.markdown(EMPTY_STATE_HTML, unsafe_allow_html=True)
     
-    # Display chat history
-    for message in st.session_state.messages:
-        # Custom avatar icons
-        avatar = USER_AVATAR if message["role"] == "user" else AI_AVATAR
-        
-        with st.chat_message(message["role"], avatar=avatar):
-            # Display content with markdown for proper formatting
-            content = message["content"]
-            if isinstance(content, str):
-                # Check if content contains a map (both GeoEPR and CISI use MAP: prefix)
-                if "MAP:" in content:
-                    # Split content into text and map parts
-                    parts = content.split("MAP:", 1)
-                    text_part = parts[0].strip()
-                    html_content = parts[1] if len(parts) > 1 else ""
-                    
-                    # Display text first if present
-                    if text_part:
-                        st.markdown(text_part, unsafe_allow_html=True)
-                    
-                    # Display map with border
-                    if html_content:
-                        st.markdown("""
-                            <div style='border: 1px solid #e4e4e7; border-radius: 0.5rem; overflow: hidden; margin-top: 1rem;'>
-                        """, unsafe_allow_html=True)
-                        st.components.v1.html(html_content, height=600, scrolling=True)
-                        st.markdown("</div>", unsafe_allow_html=True)
-                else:
-                    st.markdown(content, unsafe_allow_html=True)
-            else:
-                st.write(str(content))
-            
-            # Show confidence if enabled
-            if message["role"] == "assistant" and show_confidence and "confidence" in message:
-                confidence_pct = message['confidence'] * 100
-                confidence_color = "#166534" if confidence_pct >= 70 else "#92400e" if confidence_pct >= 40 else "#991b1b"
-                st.markdown(f"""
-                    <div style='margin-top: 0.75rem; padding: 0.5rem; background-color: #fafafa; border-radius: 0.25rem; border-left: 3px solid {confidence_color};'>
-                        <span style='color: #71717a; font-size: 0.8rem; font-weight: 500;'>Confidence: </span>
-                        <span style='color: {confidence_color}; font-size: 0.8rem; font-weight: 600;'>{confidence_pct:.0f}%</span>
-                    </div>
-                """, unsafe_allow_html=True)
-            
-            # Show sources if enabled
-            if message["role"] == "assistant" and show_sources and "sources" in message:
-                if message["sources"]:
-                    with st.expander("📚 View Sources", expanded=False):
-                        for idx, source in enumerate(message["sources"], 1):
-                            citation = source.get("citation", "Unknown Source")
-                            st.markdown(f"**{idx}. {citation}**")
-                            
-                            # Show content preview
-                            content = source.get("content", "")
-                            if content:
-                                st.markdown(f"""
-                                    <div style='background-color: #fafafa; padding: 0.75rem; border-radius: 0.25rem; margin: 0.5rem 0; font-size: 0.85rem; color: #52525b;'>
-                                        {content[:300]}{'...' if len(content) > 300 else ''}
-                                    </div>
-                                """, unsafe_allow_html=True)
-                            
-                            if idx < len(message["sources"]):
-                                st.divider()
+    # Display chat history; the display toggles live in the fragment
+    render_chat_history()
+    show_confidence = st.session_state.get("show_confidence", False)
+    show_sources = st.session_state.get("show_sources", False)
     
     # Chat input with professional placeholder
     if prompt := st.chat_input("Ask about geopolitical situations, ethnic groups, or request visualizations..."):
         # Add user message
-        st.session_state.messages.append({"role": "user", "content": prompt})
+        messages.append({"role": "user", "content": prompt})
+        history.append(chat_id, messages[-1])
         
         # Display user message
         with st.chat_message("user", avatar=USER_AVATAR):
@@ -638,81 +945,47 @@ def main():
         
         # Get AI response
         with st.chat_message("assistant", avatar=AI_AVATAR):
-            with st.spinner("Analyzing your query..."):
-                result = query_api(prompt)
+            # Stream the answer text as it arrives; a map, if any, comes last.
+            # Fixed slots keep the layout stable: an error or empty answer
+            # replaces the streamed text in place instead of appending below it.
+            result = {}
+            status = st.empty()
+            status.caption("Analyzing your query...")
+            answer_slot = st.empty()
+            streamed = answer_slot.write_stream(stream_query_api(prompt, result, status))
+            text_part = streamed if isinstance(streamed, str) else "".join(map(str, streamed))
             
             if "error" in result:
                 response = f"❌ **Error:** {result['error']}"
-                st.markdown(response)
-                st.session_state.messages.append({"role": "assistant", "content": response})
+                answer_slot.markdown(response)
+                messages.append({"role": "assistant", "content": response})
+                history.append(chat_id, messages[-1])
             else:
-                answer = result.get("answer", "I couldn't find an answer.")
-                confidence = result.get("confidence", 0)
-                sources = result.get("sources", [])
+                html_content = result.get("map", "")
                 
-                # Debug: Check answer type and value
-                if not isinstance(answer, str):
-                    answer = str(answer)
+                # Both GeoEPR and CISI maps use the MAP: prefix in the stored answer
+                answer = f"{text_part}MAP:{html_content}" if html_content else text_part
+                if not answer:
+                    answer = "I couldn't find an answer."
+                    answer_slot.markdown(answer)
                 
-                # Check if answer contains a map (both GeoEPR and CISI use MAP: prefix)
-                if "MAP:" in answer:
-                    # Split content into text and map parts
-                    parts = answer.split("MAP:", 1)
-                    text_part = parts[0].strip()
-                    html_content = parts[1] if len(parts) > 1 else ""
-                    
-                    # Display text first if present
-                    if text_part:
-                        st.markdown(text_part, unsafe_allow_html=True)
-                    
-                    # Display map with border
-                    if html_content:
-                        st.markdown("""
-                            <div style='border: 1px solid #e4e4e7; border-radius: 0.5rem; overflow: hidden; margin-top: 1rem;'>
-                        """, unsafe_allow_html=True)
-                        st.components.v1.html(html_content, height=600, scrolling=True)
-                        st.markdown("</div>", unsafe_allow_html=True)
-                else:
-                    # Display answer - using st.markdown for better formatting
-                    st.markdown(answer, unsafe_allow_html=True)
-                
-                # Display confidence
-                if show_confidence:
-                    confidence_pct = confidence * 100
-                    confidence_color = "#166534" if confidence_pct >= 70 else "#92400e" if confidence_pct >= 40 else "#991b1b"
-                    st.markdown(f"""
-                        <div style='margin-top: 0.75rem; padding: 0.5rem; background-color: #fafafa; border-radius: 0.25rem; border-left: 3px solid {confidence_color};'>
-                            <span style='color: #71717a; font-size: 0.8rem; font-weight: 500;'>Confidence: </span>
-                            <span style='color: {confidence_color}; font-size: 0.8rem; font-weight: 600;'>{confidence_pct:.0f}%</span>
-                        </div>
-                    """, unsafe_allow_html=True)
+                # Only the /query fallback reports sources and a confidence score
+                message = {
+                    "role": "assistant",
+                    "content": answer,
+                    "confidence": result.get("confidence", 1.0),
+                    "sources": [
+                        {**source, "preview": source_preview(source.get("content", ""))}
+                        for source in result.get("sources", [])
+                    ]
+                }
                 
-                # Display sources
-                if show_sources and sources:
-                    with st.expander("📚 View Sources", expanded=False):
-                        for idx, source in enumerate(sources, 1):
-                            citation = source.get("citation", "Unknown Source")
-                            st.markdown(f"**{idx}. {citation}**")
-                            
-                            # Show content preview
-                            content = source.get("content", "")
-                            if content:
-                                st.markdown(f"""
-                                    <div style='background-color: #fafafa; padding: 0.75rem; border-radius: 0.25rem; margin: 0.5rem 0; font-size: 0.85rem; color: #52525b;'>
-                                        {content[:300]}{'...' if len(content) > 300 else ''}
-                                    </div>
-                                """, unsafe_allow_html=True)
-                            
-                            if idx < len(sources):
-                                st.divider()
+                # The text has already been streamed; add the map, confidence and sources
+                render_message(message, show_confidence, show_sources, include_text=False)
                 
                 # Save to history
-                st.session_state.messages.append({
-                    "role": "assistant",
-                    "content": answer,
-                    "confidence": confidence,
-                    "sources": sources
-                })
+                messages.append(message)
+                history.append(chat_id, message)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,55 @@
+"""
+Conditional-GET helpers for large dataset downloads.
+
+Downloads are streamed straight to disk; the ETag/Last-Modified of each saved
+file is kept in a small hidden JSON sidecar next to it, so later runs can
+revalidate and receive a 304 instead of the whole file again.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Dict
+
+import requests
+
+
+def _validators_path(path: Path) -> Path:
+    return path.with_name(f".{path.name}.validators.json")
+
+
+def conditional_headers(path: Path) -> Dict[str, str]:
+    """If-None-Match/If-Modified-Since headers for a previously saved file (empty if none)"""
+    validators_path = _validators_path(path)
+    if not (path.exists() and validators_path.exists()):
+        return {}
+
+    try:
+        validators = json.loads(validators_path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
+def stream_to_file(response: requests.Response, path: Path, chunk_size: int) -> None:
+    """
+    Write a streamed response body to path and record its validators.
+
+    The body goes to a .part file that replaces path only once complete, so an
+    interrupted download never leaves a truncated file that later revalidates as current.
+    """
+    partial = path.with_name(f"{path.name}.part")
+    with open(partial, "wb") as f:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            f.write(chunk)
+    os.replace(partial, path)
+
+    _validators_path(path).write_text(json.dumps({
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }))
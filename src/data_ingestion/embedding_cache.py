@@ -0,0 +1,205 @@
+"""
+Persistent SQLite cache for embedding vectors.
+"""
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import openai
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+# Times a batch is re-sent after a 429 once the OpenAI client's own retries are used up
+RATE_LIMIT_RETRIES = 6
+
+# Wait used when a 429 carries no Retry-After or x-ratelimit-reset-* header
+DEFAULT_RETRY_AFTER = 2.0
+
+# Keys per "WHERE key IN (...)" lookup, under SQLite's bound-parameter limit
+LOOKUP_CHUNK = 500
+
+# Durations in x-ratelimit-reset-* headers look like "1s", "6m0s" or "120ms"
+_DURATION_PART = re.compile(r"([\d.]+)(ms|h|m|s)")
+_DURATION_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def _retry_after(error: openai.RateLimitError) -> float:
+    """Seconds to wait before retrying, read from the 429 response headers."""
+    headers = error.response.headers
+    if headers.get("retry-after"):
+        try:
+            return float(headers["retry-after"])
+        except ValueError:
+            pass  # HTTP-date form; fall through to the reset headers
+
+    resets = [
+        sum(float(value) * _DURATION_SECONDS[unit] for value, unit in _DURATION_PART.findall(headers[name]))
+        for name in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")
+        if headers.get(name)
+    ]
+    return max(resets) if resets else DEFAULT_RETRY_AFTER
+
+
+class _AdaptiveLimit:
+    """AIMD cap on in-flight embedding calls.
+
+    A 429 halves the cap; every cap-many successes in a row raise it by one,
+    up to the configured ceiling.
+    """
+
+    def __init__(self, ceiling: int):
+        self.ceiling = max(1, ceiling)
+        self.limit = self.ceiling
+        self._in_flight = 0
+        self._successes = 0
+        self._cond = threading.Condition()
+
+    def __enter__(self):
+        with self._cond:
+            self._cond.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+
+    def __exit__(self, *exc_info):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def success(self):
+        with self._cond:
+            self._successes += 1
+            if self.limit < self.ceiling and self._successes >= self.limit:
+                self.limit += 1
+                self._successes = 0
+                self._cond.notify_all()
+
+    def backoff(self):
+        with self._cond:
+            self.limit = max(1, self.limit // 2)
+            self._successes = 0
+
+
+class CachedEmbeddings(Embeddings):
+    """Wrap an embedding model with an on-disk cache keyed by SHA-256 of model and text.
+
+    The cache is a single SQLite file, so it survives restarts and is shared
+    by all uvicorn workers on the host. Queries and ingested documents share
+    it, so re-ingesting unchanged chunks costs no embedding calls.
+    """
+
+    def __init__(self, underlying: Embeddings, model_name: str, cache_path: str,
+                 batch_size: int = 128, concurrency: int = 1):
+        """Initialize the cache.
+
+        Args:
+            underlying: Embedding model used on cache misses
+            model_name: Model identifier, part of the cache key
+            cache_path: Path of the SQLite database file
+            batch_size: Texts per underlying embed_documents call
+            concurrency: Batches embedded at once (use 1 for in-process models)
+        """
+        self.underlying = underlying
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self._limit = _AdaptiveLimit(concurrency)
+        self.cache_path = Path(cache_path)
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.cache_path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        self._conn.commit()
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\x00{text}".encode("utf-8")).hexdigest()
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query, reusing a cached vector when available."""
+        key = self._key(text)
+
+        with self._lock:
+            row = self._conn.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            return np.frombuffer(row[0], dtype=np.float32).tolist()
+
+        vector = self.underlying.embed_query(text)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO embeddings (key, vector) VALUES (?, ?)",
+                (key, np.asarray(vector, dtype=np.float32).tobytes())
+            )
+            self._conn.commit()
+        return vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents, sending only texts missing from the cache to the model."""
+        keys = [self._key(text) for text in texts]
+        cached = self._lookup(keys)
+
+        # Embed each distinct uncached text once, then store the new vectors
+        misses = {key: text for key, text in zip(keys, texts) if key not in cached}
+        if misses:
+            logger.info(f"Embedding {len(misses)} of {len(texts)} texts ({len(texts) - len(misses)} cached)")
+            vectors = self._embed_uncached(list(misses.values()))
+            new_vectors = dict(zip(misses, vectors))
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in new_vectors.items()]
+                )
+                self._conn.commit()
+            cached.update(new_vectors)
+
+        return [cached[key] for key in keys]
+
+    def _lookup(self, keys: List[str]) -> Dict[str, List[float]]:
+        """Fetch cached vectors for the given keys with bulk IN queries."""
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+        with self._lock:
+            for start in range(0, len(unique_keys), LOOKUP_CHUNK):
+                chunk = unique_keys[start:start + LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                found.update((key, np.frombuffer(blob, dtype=np.float32).tolist()) for key, blob in rows)
+        return found
+
+    def _embed_uncached(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts with the underlying model, sending batches concurrently."""
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if self.concurrency <= 1 or len(batches) <= 1:
+            return self._embed_batch(texts)
+
+        # Remote embedding is network-bound; map() keeps vectors in input order
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            results = executor.map(self._embed_batch, batches)
+            return [vector for batch in results for vector in batch]
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embed one batch, backing off and shrinking concurrency on rate limits."""
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            with self._limit:
+                try:
+                    vectors = self.underlying.embed_documents(texts)
+                except openai.RateLimitError as e:
+                    if attempt == RATE_LIMIT_RETRIES:
+                        raise
+                    self._limit.backoff()
+                    delay = _retry_after(e)
+                else:
+                    self._limit.success()
+                    return vectors
+            # Sleep outside the slot so other workers see the reduced cap immediately
+            logger.warning(f"⚠️ Embedding rate limited; retrying in {delay:.1f}s with concurrency {self._limit.limit}")
+            time.sleep(delay)
@@ -3,12 +3,19 @@ Scraper for EPR (Ethnic Power Relations) data from ETH Zurich ICR.
 https://icr.ethz.ch/data/epr/
 """
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import logging
 
+from .conditional_download import conditional_headers, stream_to_file
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DOWNLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+
 
 class EPRScraper:
     """Scrape EPR datasets from ETH Zurich"""
@@ -42,7 +49,15 @@ class EPRScraper:
     def __init__(self, output_dir: str = "data/datasets/epr"):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        # Plain session: a response cache would buffer each whole file in memory and
+        # keep a second copy on disk; downloads revalidate via conditional_headers instead
         self.session = requests.Session()
+        # Keep connections to the ETH host alive and retry transient gateway errors
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504], allowed_methods=["GET"])
+        ))
         self.session.headers.update({
             'User-Agent': 'GeoChain/1.0 (Political Science Research Tool)'
         })
@@ -70,13 +85,17 @@ class EPRScraper:
             logger.info(f"Downloading {dataset_key}...")
             logger.info(f"URL: {url}")
             
-            response = self.session.get(url, timeout=60)
-            response.raise_for_status()
-            
-            # Save file
-            output_path.write_bytes(response.content)
+            # Upstream files change at most yearly: revalidate a saved copy with
+            # ETag/Last-Modified, else stream to disk so memory is bounded by the chunk size
+            headers = conditional_headers(output_path)
+            with self.session.get(url, headers=headers, stream=True, timeout=60) as response:
+                if response.status_code == 304:
+                    logger.info(f"✅ {filename} unchanged upstream, keeping saved copy")
+                    return True
+                response.raise_for_status()
+                stream_to_file(response, output_path, DOWNLOAD_CHUNK_SIZE)
             
-            file_size = len(response.content) / 1024  # KB
+            file_size = output_path.stat().st_size / 1024  # KB
             logger.info(f"✅ Downloaded {filename} ({file_size:.1f} KB)")
             
             return True
@@ -94,7 +113,7 @@ class EPRScraper:
     
     def download_all(self) -> dict:
         """
-        Download all EPR datasets.
+        Download all EPR datasets concurrently over the shared session.
         
         Returns:
             Dict with download results
@@ -112,12 +131,14 @@ class EPRScraper:
         for i, (key, dataset) in enumerate(self.DATASETS.items(), 1):
             print(f"[{i}/{len(self.DATASETS)}] {key}")
             print(f"    {dataset['description']}")
-            
-            if self.download_dataset(key):
-                results["successful"].append(key)
-            else:
-                results["failed"].append(key)
-            print()
+        print()
+        
+        # All datasets live on the same host; fetch them in parallel
+        with ThreadPoolExecutor(max_workers=len(self.DATASETS)) as executor:
+            outcomes = executor.map(self.download_dataset, self.DATASETS)
+            for key, ok in zip(self.DATASETS, outcomes):
+                results["successful" if ok else "failed"].append(key)
+        print()
         
         print("="*70)
         print(f"✅ Downloaded: {len(results['successful'])}/{len(self.DATASETS)}")
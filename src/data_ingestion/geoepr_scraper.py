@@ -3,15 +3,29 @@ Scraper for GeoEPR (Geographic EPR) dataset from ETH Zurich.
 GeoEPR contains spatial/geographic data of ethnic group settlement areas.
 """
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from pathlib import Path
 import logging
+import zipfile
+from importlib.util import find_spec
 import geopandas as gpd
 import pandas as pd
-from typing import Optional
+from typing import List, Optional
+
+from .conditional_download import conditional_headers, stream_to_file
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DOWNLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+# Read shapefiles through pyogrio (columnar GDAL I/O) when installed, else geopandas' default (Fiona)
+SHAPEFILE_READ_KWARGS = (
+    {"engine": "pyogrio", "use_arrow": find_spec("pyarrow") is not None}
+    if find_spec("pyogrio") is not None else {}
+)
+
 
 class GeoEPRScraper:
     """Download GeoEPR geographic ethnic settlement data."""
@@ -30,7 +44,15 @@ class GeoEPRScraper:
     def __init__(self, output_dir: str = "data/datasets/geoepr"):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        # Plain session: a response cache would buffer each whole file in memory and
+        # keep a second copy on disk; downloads revalidate via conditional_headers instead
         self.session = requests.Session()
+        # Keep connections to the ETH host alive and retry transient gateway errors
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504], allowed_methods=["GET"])
+        ))
         self.session.headers.update({
             'User-Agent': 'GeoChain/1.0 (Geospatial Research Tool)'
         })
@@ -44,16 +66,21 @@ class GeoEPRScraper:
         try:
             logger.info(f"Downloading GeoEPR from {url}...")
             
-            response = self.session.get(url, timeout=240)
-            response.raise_for_status()
+            # The archive changes at most yearly: revalidate a saved copy with
+            # ETag/Last-Modified, else stream to disk so memory is bounded by the chunk size
+            headers = conditional_headers(zip_path)
+            with self.session.get(url, headers=headers, stream=True, timeout=240) as response:
+                if response.status_code == 304 and list(self.output_dir.glob("*.shp")):
+                    logger.info(f"✅ {dataset['filename']} unchanged upstream, keeping extracted shapefile")
+                    return True
+                if response.status_code != 304:
+                    response.raise_for_status()
+                    stream_to_file(response, zip_path, DOWNLOAD_CHUNK_SIZE)
             
-            # Save zip file
-            zip_path.write_bytes(response.content)
-            file_size = len(response.content) / 1024 / 1024  # MB
+            file_size = zip_path.stat().st_size / 1024 / 1024  # MB
             logger.info(f"✅ Downloaded {dataset['filename']} ({file_size:.1f} MB)")
             
             # Extract zip file
-            import zipfile
             logger.info("Extracting shapefile...")
             with zipfile.ZipFile(zip_path, 'r') as zip_ref:
                 zip_ref.extractall(self.output_dir)
@@ -72,8 +99,12 @@ class GeoEPRScraper:
             logger.error(f"❌ Error downloading GeoEPR: {e}")
             return False
     
-    def load_shapefile(self) -> Optional[gpd.GeoDataFrame]:
-        """Load the GeoEPR shapefile after downloading."""
+    def load_shapefile(self, columns: Optional[List[str]] = None) -> Optional[gpd.GeoDataFrame]:
+        """Load the GeoEPR shapefile after downloading.
+        
+        Args:
+            columns: Attribute columns to read (default: all); geometry is always read
+        """
         # Look for .shp file in the output directory
         shp_files = list(self.output_dir.glob("*.shp"))
         
@@ -85,7 +116,10 @@ class GeoEPRScraper:
         logger.info(f"Loading shapefile: {shp_file}")
         
         try:
-            gdf = gpd.read_file(shp_file)
+            read_kwargs = dict(SHAPEFILE_READ_KWARGS)
+            if columns:
+                read_kwargs["columns"] = columns
+            gdf = gpd.read_file(shp_file, **read_kwargs)
             logger.info(f"✅ Loaded {len(gdf)} ethnic group polygons")
             logger.info(f"Columns: {', '.join(gdf.columns)}")
             return gdf
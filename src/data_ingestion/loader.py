@@ -2,35 +2,67 @@
 Data loading utilities for various file formats.
 """
 import pandas as pd
+import ijson
 import json
+import os
+from importlib.util import find_spec
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# pyarrow parses CSVs multi-threaded; without it pandas uses its C parser
+CSV_ENGINE = "pyarrow" if find_spec("pyarrow") is not None else "c"
+
+# JSON files above this size are parsed incrementally instead of read whole
+JSON_STREAM_THRESHOLD = 50 * 1024 * 1024  # 50 MB
+
 
 class DataLoader:
     """Load and parse data from various file formats"""
     
     @staticmethod
-    def load_csv(file_path: str) -> pd.DataFrame:
-        """Load CSV file into DataFrame"""
+    def load_csv(file_path: str, usecols: Optional[List[str]] = None,
+                 dtype: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        """Load CSV file into DataFrame
+        
+        Args:
+            file_path: Path to the CSV file
+            usecols: Only parse these columns (default: all columns)
+            dtype: Column dtypes, skipping inference for those columns
+        """
         try:
-            df = pd.read_csv(file_path)
+            df = pd.read_csv(file_path, engine=CSV_ENGINE, usecols=usecols, dtype=dtype)
             logger.info(f"Loaded CSV with {len(df)} rows from {file_path}")
             return df
         except Exception as e:
             logger.error(f"Error loading CSV {file_path}: {str(e)}")
             raise
     
+    @staticmethod
+    def iter_json(file_path: str) -> Iterator[Dict[str, Any]]:
+        """Stream records from a JSON file without holding the raw text in memory
+        
+        Items of a top-level array are yielded one at a time; a top-level
+        object is yielded as a single record.
+        """
+        with open(file_path, 'rb') as f:
+            is_array = f.read(1024).lstrip().startswith(b'[')
+            f.seek(0)
+            yield from ijson.items(f, 'item' if is_array else '', use_float=True)
+    
     @staticmethod
     def load_json(file_path: str) -> List[Dict[str, Any]]:
         """Load JSON file"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            if os.path.getsize(file_path) > JSON_STREAM_THRESHOLD:
+                # Build the records straight from the byte stream
+                data = list(DataLoader.iter_json(file_path))
+            else:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
             
             # Convert to list if single dict
             if isinstance(data, dict):
@@ -65,6 +97,28 @@ class DataLoader:
             logger.error(f"Error loading Parquet {file_path}: {str(e)}")
             raise
     
+    @staticmethod
+    def load_csv_snapshot(file_path: Path, **read_kwargs) -> pd.DataFrame:
+        """Load a CSV via a Parquet snapshot kept next to it
+        
+        The snapshot (same name, .parquet suffix) is used while it is at least
+        as new as the CSV; otherwise the CSV is parsed and the snapshot rewritten.
+        """
+        file_path = Path(file_path)
+        snapshot = file_path.with_suffix('.parquet')
+        
+        if snapshot.exists() and snapshot.stat().st_mtime >= file_path.stat().st_mtime:
+            return pd.read_parquet(snapshot)
+        
+        df = pd.read_csv(file_path, **read_kwargs)
+        try:
+            df.to_parquet(snapshot, compression='zstd')
+        except Exception as e:
+            # Mixed-type object columns can't always be written; the CSV still works
+            logger.warning(f"Could not write Parquet snapshot {snapshot}: {e}")
+            snapshot.unlink(missing_ok=True)
+        return df
+    
     @staticmethod
     def load_dataset(file_path: str) -> Any:
         """Auto-detect format and load dataset"""
@@ -1,14 +1,57 @@
 """
 Document processing and chunking for LangChain.
 """
+import re
+from itertools import islice
+
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Keywords that tag a document with a content hint (substring match, case-insensitive)
+CONTENT_HINT_TERMS = {
+    "economic": ["gdp", "economy", "economic", "trade", "income"],
+    "demographic": ["population", "demographic", "birth", "death", "age"],
+    "political": ["political", "government", "president", "minister", "party"],
+    "ethnic": ["ethnic", "group", "minority", "tribe"],
+    "conflict": ["conflict", "war", "violence", "crisis"],
+    "military": ["military", "defense", "armed forces", "security"],
+    "education": ["education", "literacy", "school", "university"],
+    "health": ["health", "medical", "disease", "mortality"],
+}
+
+# One precompiled alternation per category so each document is scanned once per hint
+HINT_PATTERNS = {
+    hint: re.compile("|".join(map(re.escape, terms)), re.IGNORECASE)
+    for hint, terms in CONTENT_HINT_TERMS.items()
+}
+
+# Each hint is one bit of metadata["content_hints_mask"], in CONTENT_HINT_TERMS order
+HINT_BITS = {hint: 1 << position for position, hint in enumerate(CONTENT_HINT_TERMS)}
+
+# process_json has historically only tagged these categories
+JSON_HINTS = ("economic", "demographic", "political", "ethnic")
+
+# Rows turned into Documents per step of iter_documents
+DATAFRAME_CHUNK_ROWS = 512
+
+
+def mask_to_names(mask: int) -> List[str]:
+    """Decode a content_hints_mask into hint names ("general" when no bit is set)"""
+    return [hint for hint, bit in HINT_BITS.items() if mask & bit] or ["general"]
+
+
+def batched(iterable: Iterable, n: int) -> Iterator[list]:
+    """Yield successive lists of up to n items (itertools.batched before Python 3.12)"""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, n)):
+        yield batch
+
 
 class DocumentProcessor:
     """Process and chunk documents for vector storage"""
@@ -19,7 +62,6 @@ class DocumentProcessor:
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
-            length_function=len,
         )
     
     def process_dataframe(self, df: pd.DataFrame, 
@@ -35,8 +77,28 @@ class DocumentProcessor:
             metadata_columns: Columns to store as metadata (default: all columns)
             base_metadata: Base metadata to add to all documents (source info, etc.)
         """
-        documents = []
+        documents = list(self.iter_documents(df, text_columns, metadata_columns, base_metadata))
+        logger.info(f"Processed {len(documents)} documents from DataFrame")
+        return documents
+    
+    def iter_documents(self, df: pd.DataFrame,
+                       text_columns: List[str] = None,
+                       metadata_columns: List[str] = None,
+                       base_metadata: dict = None,
+                       chunk_rows: int = DATAFRAME_CHUNK_ROWS) -> Iterator[Document]:
+        """
+        Lazily convert DataFrame rows to LangChain Documents, one per row.
         
+        Rows are processed column-wise in chunks of chunk_rows, so only one
+        chunk of Documents is held in memory at a time.
+        
+        Args:
+            df: Input DataFrame
+            text_columns: Columns to use as document content (default: all columns)
+            metadata_columns: Columns to store as metadata (default: all columns)
+            base_metadata: Base metadata to add to all documents (source info, etc.)
+            chunk_rows: Number of rows processed per step
+        """
         # If not specified, use ALL columns in content
         if text_columns is None:
             text_columns = list(df.columns)
@@ -45,72 +107,70 @@ class DocumentProcessor:
         if metadata_columns is None:
             metadata_columns = list(df.columns)
         
-        for idx, row in df.iterrows():
-            # Combine ALL columns into content for LLM visibility
-            text_parts = []
-            for col in text_columns:
-                if pd.notna(row[col]):
-                    text_parts.append(f"{col}: {row[col]}")
-            
-            content = "\n".join(text_parts)
-            
-            # Build metadata with base metadata first
-            metadata = base_metadata.copy() if base_metadata else {}
-            metadata["row_id"] = idx
-            metadata["doc_id"] = f"{base_metadata.get('source_name', 'unknown')}_{idx}"
+        base_metadata = base_metadata or {}
+        source_name = base_metadata.get('source_name', 'unknown')
+        
+        country_columns = [
+            col for col in metadata_columns
+            if any(keyword in col.lower() for keyword in ["country", "nation", "state"])
+        ]
+        labels = np.array([f"{col}: " for col in text_columns], dtype=object)
+        
+        for start in range(0, len(df), chunk_rows):
+            chunk = df.iloc[start:start + chunk_rows]
             
-            # Add content type hints for better retrieval
-            content_lower = content.lower()
-            metadata["content_hints"] = []
-            if any(term in content_lower for term in ["gdp", "economy", "economic", "trade", "income"]):
-                metadata["content_hints"].append("economic")
-            if any(term in content_lower for term in ["population", "demographic", "birth", "death", "age"]):
-                metadata["content_hints"].append("demographic")
-            if any(term in content_lower for term in ["political", "government", "president", "minister", "party"]):
-                metadata["content_hints"].append("political")
-            if any(term in content_lower for term in ["ethnic", "group", "minority", "tribe"]):
-                metadata["content_hints"].append("ethnic")
-            if any(term in content_lower for term in ["conflict", "war", "violence", "crisis"]):
-                metadata["content_hints"].append("conflict")
-            if any(term in content_lower for term in ["military", "defense", "armed forces", "security"]):
-                metadata["content_hints"].append("military")
-            if any(term in content_lower for term in ["education", "literacy", "school", "university"]):
-                metadata["content_hints"].append("education")
-            if any(term in content_lower for term in ["health", "medical", "disease", "mortality"]):
-                metadata["content_hints"].append("health")
+            # Combine ALL columns into content for LLM visibility, column-wise
+            # instead of per row: "col: value" for every non-null cell
+            text_df = chunk[text_columns]
+            parts = labels + text_df.astype(str).to_numpy(dtype=object)
+            present = text_df.notna().to_numpy()
+            contents = pd.Series(
+                ["\n".join(parts[i, present[i]]) for i in range(len(chunk))],
+                index=chunk.index,
+                dtype=object
+            )
             
-            metadata["content_hints"] = ",".join(metadata["content_hints"]) if metadata["content_hints"] else "general"
+            # Add content type hints for better retrieval as a bitmask, one scan per category
+            hint_masks = np.zeros(len(chunk), dtype=np.int64)
+            for hint, pattern in HINT_PATTERNS.items():
+                hint_masks[contents.str.contains(pattern, regex=True).to_numpy()] |= HINT_BITS[hint]
             
-            # Extract country mentions for better filtering
-            countries_mentioned = []
-            for col in metadata_columns:
-                if pd.notna(row[col]) and any(keyword in col.lower() for keyword in ["country", "nation", "state"]):
-                    countries_mentioned.append(str(row[col]))
-            if countries_mentioned:
-                metadata["countries"] = ",".join(countries_mentioned[:3])  # Limit to 3
+            # Extract country mentions (first 3 non-null country-like columns) for better filtering
+            country_values = chunk[country_columns].astype(str).to_numpy(dtype=object)
+            country_present = chunk[country_columns].notna().to_numpy()
             
-            # Add column data to metadata
-            for col in metadata_columns:
-                if pd.notna(row[col]):
-                    metadata[col] = str(row[col])
+            # Column data for metadata, with nulls dropped
+            meta_df = chunk[metadata_columns]
+            column_records = meta_df.astype(str).where(meta_df.notna(), None).to_dict("records")
             
-            documents.append(Document(page_content=content, metadata=metadata))
-        
-        logger.info(f"Processed {len(documents)} documents from DataFrame")
-        return documents
+            for i, idx in enumerate(chunk.index.tolist()):
+                # Build metadata with base metadata first
+                metadata = {**base_metadata, "row_id": idx, "doc_id": f"{source_name}_{idx}"}
+                
+                metadata["content_hints_mask"] = int(hint_masks[i])
+                
+                countries_mentioned = country_values[i, country_present[i]]
+                if len(countries_mentioned):
+                    metadata["countries"] = ",".join(countries_mentioned[:3])  # Limit to 3
+                
+                metadata.update({col: value for col, value in column_records[i].items() if value is not None})
+                
+                yield Document(page_content=contents.iat[i], metadata=metadata)
     
-    def process_json(self, data: List[Dict[str, Any]], 
+    def process_json(self, data: Iterable[Dict[str, Any]], 
                      text_fields: List[str] = None,
                      base_metadata: dict = None) -> List[Document]:
         """
         Convert JSON data to LangChain Documents.
         
         Args:
-            data: List of dictionaries
+            data: List (or any iterable, e.g. DataLoader.iter_json) of dictionaries
             text_fields: Fields to use as document content
             base_metadata: Base metadata to add to all documents
         """
         documents = []
+        base_metadata = base_metadata or {}
+        source_name = base_metadata.get('source_name', 'unknown')
         
         for idx, item in enumerate(data):
             if text_fields:
@@ -123,23 +183,12 @@ class DocumentProcessor:
                 content = "\n".join([f"{k}: {v}" for k, v in item.items()])
             
             # Create metadata with base metadata
-            metadata = base_metadata.copy() if base_metadata else {}
-            metadata["item_id"] = idx
-            metadata["doc_id"] = f"{base_metadata.get('source_name', 'unknown')}_{idx}"
+            metadata = {**base_metadata, "item_id": idx, "doc_id": f"{source_name}_{idx}"}
             
             # Add content hints
-            content_lower = content.lower()
-            metadata["content_hints"] = []
-            if any(term in content_lower for term in ["gdp", "economy", "economic", "trade", "income"]):
-                metadata["content_hints"].append("economic")
-            if any(term in content_lower for term in ["population", "demographic", "birth", "death", "age"]):
-                metadata["content_hints"].append("demographic")
-            if any(term in content_lower for term in ["political", "government", "president", "minister", "party"]):
-                metadata["content_hints"].append("political")
-            if any(term in content_lower for term in ["ethnic", "group", "minority", "tribe"]):
-                metadata["content_hints"].append("ethnic")
-            
-            metadata["content_hints"] = ",".join(metadata["content_hints"]) if metadata["content_hints"] else "general"
+            metadata["content_hints_mask"] = sum(
+                HINT_BITS[hint] for hint in JSON_HINTS if HINT_PATTERNS[hint].search(content)
+            )
             
             # Add other item data to metadata
             metadata.update({k: str(v) for k, v in item.items() 
@@ -171,11 +220,6 @@ class DocumentProcessor:
     
     def chunk_documents(self, documents: List[Document]) -> List[Document]:
         """Apply text splitting to existing documents"""
-        chunked_docs = []
-        
-        for doc in documents:
-            chunks = self.text_splitter.split_documents([doc])
-            chunked_docs.extend(chunks)
-        
+        chunked_docs = self.text_splitter.split_documents(documents)
         logger.info(f"Chunked {len(documents)} documents into {len(chunked_docs)} chunks")
         return chunked_docs
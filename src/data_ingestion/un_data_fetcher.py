@@ -3,9 +3,15 @@ Fetcher for UN Data API datasets.
 """
 import requests
 import pandas as pd
+from io import BytesIO
 from pathlib import Path
 import logging
+from requests.adapters import HTTPAdapter
 from typing import Optional
+from urllib.parse import quote
+from urllib3.util.retry import Retry
+
+from .loader import CSV_ENGINE
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -19,6 +25,18 @@ class UNDataFetcher:
     def __init__(self, output_dir: str = "data/datasets/un_data"):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        # One keep-alive connection pool for all data.un.org requests, with backoff on transient errors
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=2,
+            pool_maxsize=8,
+            max_retries=Retry(
+                total=5,
+                backoff_factor=0.8,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=["GET"]
+            )
+        ))
     
     def fetch_dataset(self, dataset_code: str, save: bool = True) -> Optional[pd.DataFrame]:
         """
@@ -38,12 +56,11 @@ class UNDataFetcher:
         """
         try:
             # URL encode the dataset code to handle spaces
-            from urllib.parse import quote
             encoded_code = quote(dataset_code)
             url = f"{self.BASE_URL}/{encoded_code}"
             logger.info(f"Fetching: {url}")
             
-            response = requests.get(url, timeout=30)
+            response = self.session.get(url, timeout=30)
             response.raise_for_status()
             
             # Save raw file
@@ -54,9 +71,8 @@ class UNDataFetcher:
                 filepath.write_bytes(response.content)
                 logger.info(f"Saved to: {filepath}")
             
-            # Parse CSV from response content
-            from io import StringIO
-            df = pd.read_csv(StringIO(response.text), encoding='utf-8')
+            # Parse CSV from the response bytes (no intermediate decoded str copy)
+            df = pd.read_csv(BytesIO(response.content), encoding='utf-8', engine=CSV_ENGINE)
             logger.info(f"Loaded {len(df)} rows")
             
             return df
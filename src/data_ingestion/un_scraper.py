@@ -2,17 +2,255 @@
 Comprehensive UN Data scraper to discover and fetch all available datasets.
 """
 import requests
-from bs4 import BeautifulSoup
 import pandas as pd
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
 from pathlib import Path
 import logging
-from typing import Optional, List, Dict
+import os
+import threading
 import time
-from urllib.parse import urljoin, quote
+from requests.adapters import HTTPAdapter
+from tqdm import tqdm
+from types import MappingProxyType
+from typing import Optional, List, Dict, Mapping
+from urllib.parse import quote
+from urllib3.util.retry import Retry
+
+from .conditional_download import conditional_headers, stream_to_file
+from .loader import CSV_ENGINE, DataLoader
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Concurrent downloads from data.un.org; also the connection pool size
+MAX_CONCURRENT_FETCHES = 8
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# low_memory only exists for pandas' C parser; pyarrow reads whole columns anyway
+CSV_READ_KWARGS = {"engine": CSV_ENGINE, **({"low_memory": False} if CSV_ENGINE == "c" else {})}
+
+# Known direct CSV links from UN Statistical Yearbook (SYB67, Updated Nov 2024)
+SYB_CSV_BASE = "https://data.un.org/_Docs/SYB/CSV"
+
+_KNOWN_DATASETS = (
+    # Population
+    {
+        "name": "Population, Surface Area and Density",
+        "code": "SYB67_1_202411_Population, Surface Area and Density.csv",
+        "category": "Demographics"
+    },
+    {
+        "name": "International Migrants and Refugees",
+        "code": "SYB67_327_202411_International Migrants and Refugees.csv",
+        "category": "Demographics"
+    },
+    {
+        "name": "Population Growth, Fertility and Mortality Indicators",
+        "code": "SYB67_246_202411_Population Growth, Fertility and Mortality Indicators.csv",
+        "category": "Demographics"
+    },
+    {
+        "name": "Population Growth Rates in Urban areas and Capital cities",
+        "code": "SYB61_253_Population Growth Rates in Urban areas and Capital cities.csv",
+        "category": "Demographics"
+    },
+    # National Accounts
+    {
+        "name": "GDP and GDP Per Capita",
+        "code": "SYB67_230_202411_GDP and GDP Per Capita.csv",
+        "category": "Economy"
+    },
+    {
+        "name": "Gross Value Added by Economic Activity",
+        "code": "SYB67_153_202411_Gross Value Added by Economic Activity.csv",
+        "category": "Economy"
+    },
+    # Education
+    {
+        "name": "Education",
+        "code": "SYB67_309_202411_Education.csv",
+        "category": "Education"
+    },
+    {
+        "name": "Teaching Staff in education",
+        "code": "SYB67_323_202411_Teaching Staff in education.csv",
+        "category": "Education"
+    },
+    {
+        "name": "Public expenditure on education and access to computers",
+        "code": "SYB67_245_202411_Public expenditure on education and access to computers.csv",
+        "category": "Education"
+    },
+    # Labour Market
+    {
+        "name": "Labour Force and Unemployment",
+        "code": "SYB67_329_202411_Labour Force and Unemployment.csv",
+        "category": "Employment"
+    },
+    {
+        "name": "Employment",
+        "code": "SYB67_200_202411_Employment.csv",
+        "category": "Employment"
+    },
+    # Price and Production
+    {
+        "name": "Consumer Price Index",
+        "code": "SYB67_128_202411_Consumer Price Index.csv",
+        "category": "Economy"
+    },
+    {
+        "name": "Agricultural Index",
+        "code": "SYB67_12_202411_Agricultural Index.csv",
+        "category": "Agriculture"
+    },
+    # International Trade
+    {
+        "name": "Total Imports Exports and Balance of Trade",
+        "code": "SYB67_123_202411_Total Imports Exports and Balance of Trade.csv",
+        "category": "Trade"
+    },
+    {
+        "name": "Major Trading Partners",
+        "code": "SYB67_330_202411_Major Trading Partners.csv",
+        "category": "Trade"
+    },
+    # Energy
+    {
+        "name": "Production, Trade and Supply of Energy",
+        "code": "SYB67_263_202411_Production, Trade and Supply of Energy.csv",
+        "category": "Energy"
+    },
+    # Crime
+    {
+        "name": "Intentional homicides and other crimes",
+        "code": "SYB67_328_202411_Intentional homicides and other crimes.csv",
+        "category": "Crime"
+    },
+    # Gender
+    {
+        "name": "Seats held by women in Parliament",
+        "code": "SYB67_317_202411_Seats held by women in Parliament.csv",
+        "category": "Gender"
+    },
+    {
+        "name": "Ratio of girls to boys in education",
+        "code": "SYB67_319_202411_Ratio of girls to boys in education.csv",
+        "category": "Gender"
+    },
+    # Health
+    {
+        "name": "Health Personnel",
+        "code": "SYB67_154_202411_Health Personnel.csv",
+        "category": "Health"
+    },
+    {
+        "name": "Expenditure on health",
+        "code": "SYB67_325_202411_Expenditure on health.csv",
+        "category": "Health"
+    },
+    # Science and Technology
+    {
+        "name": "Research and Development Expenditure and Staff",
+        "code": "SYB67_285_202411_Research and Development Expenditure and Staff.csv",
+        "category": "Science"
+    },
+    {
+        "name": "Patents",
+        "code": "SYB67_264_202411_Patents.csv",
+        "category": "Innovation"
+    },
+    # Finance
+    {
+        "name": "Balance of Payments",
+        "code": "SYB67_125_202411_Balance of Payments.csv",
+        "category": "Finance"
+    },
+    {
+        "name": "Exchange Rates",
+        "code": "SYB67_130_202411_Exchange Rates.csv",
+        "category": "Finance"
+    },
+    # Environment
+    {
+        "name": "Land",
+        "code": "SYB67_145_202411_Land.csv",
+        "category": "Environment"
+    },
+    {
+        "name": "Carbon Dioxide Emission Estimates",
+        "code": "SYB67_310_202411_Carbon Dioxide Emission Estimates.csv",
+        "category": "Environment"
+    },
+    {
+        "name": "Water and Sanitation Services",
+        "code": "SYB67_315_202411_Water and Sanitation Services.csv",
+        "category": "Environment"
+    },
+    {
+        "name": "Threatened Species",
+        "code": "SYB67_313_202411_Threatened Species.csv",
+        "category": "Environment"
+    },
+    # Communication
+    {
+        "name": "Internet Usage",
+        "code": "SYB67_314_202411_Internet Usage.csv",
+        "category": "Technology"
+    },
+    # Tourism
+    {
+        "name": "Tourist-Visitors Arrival and Expenditure",
+        "code": "SYB67_176_202411_Tourist-Visitors Arrival and Expenditure.csv",
+        "category": "Tourism"
+    },
+    # Development Assistance
+    {
+        "name": "Net Disbursements from Official ODA to Recipients",
+        "code": "SYB67_226_202411_Net Disbursements from Official ODA to Recipients.csv",
+        "category": "Development"
+    },
+    {
+        "name": "Net Disbursements from Official ODA from Donors",
+        "code": "SYB67_223_202411_Net Disbursements from Official ODA from Donors.csv",
+        "category": "Development"
+    }
+)
+
+# Dataset entries with URLs and safe filenames, built once at import time; read-only
+# views so the same entries can be handed to every caller and fetch worker
+_DATASETS = tuple(
+    MappingProxyType({
+        "name": ds["name"],
+        "category": ds["category"],
+        "url": f"{SYB_CSV_BASE}/{quote(ds['code'])}",
+        "filename": ds["code"].replace(' ', '_').replace(',', '')
+    })
+    for ds in _KNOWN_DATASETS
+)
+
+# Category -> dataset entries, for fetch_by_category and the category listing
+_DATASETS_BY_CATEGORY: Dict[str, List[Mapping[str, str]]] = defaultdict(list)
+for _ds in _DATASETS:
+    _DATASETS_BY_CATEGORY[_ds["category"]].append(_ds)
+
+
+class _RateLimiter:
+    """Thread-safe leaky bucket: request starts are spaced at least 1/rate seconds apart"""
+    
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+    
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        time.sleep(slot - now)
+
 
 class UNDataScraper:
     """Scrape and fetch all available datasets from UN Data"""
@@ -20,218 +258,40 @@ class UNDataScraper:
     BASE_URL = "https://data.un.org"
     CATALOG_URL = "https://data.un.org/Browse.aspx"
     
-    def __init__(self, output_dir: str = "data/datasets/un_data"):
+    def __init__(self, output_dir: str = "data/datasets/un_data", cache_ttl_days: int = 7,
+                 max_requests_per_second: float = 2.0):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        # Saved files younger than this are loaded from disk without any request
+        self.cache_ttl = timedelta(days=cache_ttl_days)
+        # Global request rate shared by all fetch workers (be respectful to server)
+        self._limiter = _RateLimiter(max_requests_per_second)
+        # Plain session: a response cache would buffer each whole CSV in memory before
+        # streaming; stale saved files are revalidated via conditional_headers instead
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
         })
+        # Back off exponentially on rate limiting and server errors (honours Retry-After);
+        # a status that still fails after the retries is returned for fetch_dataset to report
+        self.session.mount("https://", HTTPAdapter(
+            pool_maxsize=MAX_CONCURRENT_FETCHES,
+            max_retries=Retry(
+                total=5,
+                backoff_factor=0.8,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=["GET"],
+                raise_on_status=False
+            )
+        ))
     
-    def discover_datasets(self) -> List[Dict[str, str]]:
+    def discover_datasets(self) -> List[Mapping[str, str]]:
         """
         Discover all available datasets from UN Data.
         Returns list of dataset info dicts with name, description, and download link.
         """
-        datasets = []
-        
-        # Known direct CSV links from UN Statistical Yearbook (SYB67, Updated Nov 2024)
-        syb_base = "https://data.un.org/_Docs/SYB/CSV"
-        
-        known_datasets = [
-            # Population
-            {
-                "name": "Population, Surface Area and Density",
-                "code": "SYB67_1_202411_Population, Surface Area and Density.csv",
-                "category": "Demographics"
-            },
-            {
-                "name": "International Migrants and Refugees",
-                "code": "SYB67_327_202411_International Migrants and Refugees.csv",
-                "category": "Demographics"
-            },
-            {
-                "name": "Population Growth, Fertility and Mortality Indicators",
-                "code": "SYB67_246_202411_Population Growth, Fertility and Mortality Indicators.csv",
-                "category": "Demographics"
-            },
-            {
-                "name": "Population Growth Rates in Urban areas and Capital cities",
-                "code": "SYB61_253_Population Growth Rates in Urban areas and Capital cities.csv",
-                "category": "Demographics"
-            },
-            # National Accounts
-            {
-                "name": "GDP and GDP Per Capita",
-                "code": "SYB67_230_202411_GDP and GDP Per Capita.csv",
-                "category": "Economy"
-            },
-            {
-                "name": "Gross Value Added by Economic Activity",
-                "code": "SYB67_153_202411_Gross Value Added by Economic Activity.csv",
-                "category": "Economy"
-            },
-            # Education
-            {
-                "name": "Education",
-                "code": "SYB67_309_202411_Education.csv",
-                "category": "Education"
-            },
-            {
-                "name": "Teaching Staff in education",
-                "code": "SYB67_323_202411_Teaching Staff in education.csv",
-                "category": "Education"
-            },
-            {
-                "name": "Public expenditure on education and access to computers",
-                "code": "SYB67_245_202411_Public expenditure on education and access to computers.csv",
-                "category": "Education"
-            },
-            # Labour Market
-            {
-                "name": "Labour Force and Unemployment",
-                "code": "SYB67_329_202411_Labour Force and Unemployment.csv",
-                "category": "Employment"
-            },
-            {
-                "name": "Employment",
-                "code": "SYB67_200_202411_Employment.csv",
-                "category": "Employment"
-            },
-            # Price and Production
-            {
-                "name": "Consumer Price Index",
-                "code": "SYB67_128_202411_Consumer Price Index.csv",
-                "category": "Economy"
-            },
-            {
-                "name": "Agricultural Index",
-                "code": "SYB67_12_202411_Agricultural Index.csv",
-                "category": "Agriculture"
-            },
-            # International Trade
-            {
-                "name": "Total Imports Exports and Balance of Trade",
-                "code": "SYB67_123_202411_Total Imports Exports and Balance of Trade.csv",
-                "category": "Trade"
-            },
-            {
-                "name": "Major Trading Partners",
-                "code": "SYB67_330_202411_Major Trading Partners.csv",
-                "category": "Trade"
-            },
-            # Energy
-            {
-                "name": "Production, Trade and Supply of Energy",
-                "code": "SYB67_263_202411_Production, Trade and Supply of Energy.csv",
-                "category": "Energy"
-            },
-            # Crime
-            {
-                "name": "Intentional homicides and other crimes",
-                "code": "SYB67_328_202411_Intentional homicides and other crimes.csv",
-                "category": "Crime"
-            },
-            # Gender
-            {
-                "name": "Seats held by women in Parliament",
-                "code": "SYB67_317_202411_Seats held by women in Parliament.csv",
-                "category": "Gender"
-            },
-            {
-                "name": "Ratio of girls to boys in education",
-                "code": "SYB67_319_202411_Ratio of girls to boys in education.csv",
-                "category": "Gender"
-            },
-            # Health
-            {
-                "name": "Health Personnel",
-                "code": "SYB67_154_202411_Health Personnel.csv",
-                "category": "Health"
-            },
-            {
-                "name": "Expenditure on health",
-                "code": "SYB67_325_202411_Expenditure on health.csv",
-                "category": "Health"
-            },
-            # Science and Technology
-            {
-                "name": "Research and Development Expenditure and Staff",
-                "code": "SYB67_285_202411_Research and Development Expenditure and Staff.csv",
-                "category": "Science"
-            },
-            {
-                "name": "Patents",
-                "code": "SYB67_264_202411_Patents.csv",
-                "category": "Innovation"
-            },
-            # Finance
-            {
-                "name": "Balance of Payments",
-                "code": "SYB67_125_202411_Balance of Payments.csv",
-                "category": "Finance"
-            },
-            {
-                "name": "Exchange Rates",
-                "code": "SYB67_130_202411_Exchange Rates.csv",
-                "category": "Finance"
-            },
-            # Environment
-            {
-                "name": "Land",
-                "code": "SYB67_145_202411_Land.csv",
-                "category": "Environment"
-            },
-            {
-                "name": "Carbon Dioxide Emission Estimates",
-                "code": "SYB67_310_202411_Carbon Dioxide Emission Estimates.csv",
-                "category": "Environment"
-            },
-            {
-                "name": "Water and Sanitation Services",
-                "code": "SYB67_315_202411_Water and Sanitation Services.csv",
-                "category": "Environment"
-            },
-            {
-                "name": "Threatened Species",
-                "code": "SYB67_313_202411_Threatened Species.csv",
-                "category": "Environment"
-            },
-            # Communication
-            {
-                "name": "Internet Usage",
-                "code": "SYB67_314_202411_Internet Usage.csv",
-                "category": "Technology"
-            },
-            # Tourism
-            {
-                "name": "Tourist-Visitors Arrival and Expenditure",
-                "code": "SYB67_176_202411_Tourist-Visitors Arrival and Expenditure.csv",
-                "category": "Tourism"
-            },
-            # Development Assistance
-            {
-                "name": "Net Disbursements from Official ODA to Recipients",
-                "code": "SYB67_226_202411_Net Disbursements from Official ODA to Recipients.csv",
-                "category": "Development"
-            },
-            {
-                "name": "Net Disbursements from Official ODA from Donors",
-                "code": "SYB67_223_202411_Net Disbursements from Official ODA from Donors.csv",
-                "category": "Development"
-            }
-        ]
-        
-        for ds in known_datasets:
-            datasets.append({
-                "name": ds["name"],
-                "category": ds["category"],
-                "url": f"{syb_base}/{quote(ds['code'])}",
-                "filename": ds["code"].replace(' ', '_').replace(',', '')
-            })
-        
-        logger.info(f"Discovered {len(datasets)} datasets")
-        return datasets
+        logger.info(f"Discovered {len(_DATASETS)} datasets")
+        return list(_DATASETS)
     
     def fetch_dataset(self, url: str, filename: str) -> Optional[pd.DataFrame]:
         """
@@ -245,40 +305,59 @@ class UNDataScraper:
             DataFrame with the data
         """
         try:
-            logger.info(f"Fetching: {filename}")
-            logger.info(f"URL: {url}")
-            
-            response = self.session.get(url, timeout=60)
-            
-            logger.info(f"Status code: {response.status_code}")
-            
-            # Check for server errors and skip
-            if response.status_code >= 500:
-                logger.warning(f"⚠️  Server error ({response.status_code}), skipping: {filename}")
-                return None
-            
-            if response.status_code == 404:
-                logger.warning(f"⚠️  File not found (404), skipping: {filename}")
-                return None
+            filepath = self.output_dir / filename
             
-            response.raise_for_status()
+            # SYB snapshots are published yearly; a recent download is still current
+            if filepath.exists() and time.time() - filepath.stat().st_mtime < self.cache_ttl.total_seconds():
+                df = DataLoader.load_csv_snapshot(filepath, encoding='utf-8', **CSV_READ_KWARGS)
+                logger.info(f"✅ Using saved {filename} ({len(df)} rows)")
+                return df
             
-            # Check content type
-            content_type = response.headers.get('content-type', '')
-            logger.info(f"Content-Type: {content_type}")
+            logger.info(f"Fetching: {filename}")
+            logger.info(f"URL: {url}")
             
-            # Check if response is actually CSV
-            if 'text/csv' not in content_type and 'text/plain' not in content_type:
-                logger.warning(f"⚠️  Unexpected content type: {content_type}, trying anyway...")
+            # Revalidate an older saved copy (ETag/Last-Modified) so an unchanged file costs a 304;
+            # otherwise stream the body to disk so memory stays at one chunk per concurrent download
+            self._limiter.wait()
+            headers = conditional_headers(filepath)
+            with self.session.get(url, headers=headers, stream=True, timeout=60) as response:
+                logger.info(f"Status code: {response.status_code}")
+                
+                if response.status_code == 304:
+                    # Restart the cache_ttl window. CSV first, so the Parquet snapshot stays
+                    # at least as new and load_csv_snapshot keeps using it
+                    os.utime(filepath)
+                    snapshot = filepath.with_suffix('.parquet')
+                    if snapshot.exists():
+                        os.utime(snapshot)
+                    df = DataLoader.load_csv_snapshot(filepath, encoding='utf-8', **CSV_READ_KWARGS)
+                    logger.info(f"✅ {filename} unchanged upstream, using saved copy ({len(df)} rows)")
+                    return df
+                
+                # Skip missing files before reading the body; other errors raise below
+                if response.status_code == 404:
+                    logger.warning(f"⚠️  File not found (404), skipping: {filename}")
+                    return None
+                
+                response.raise_for_status()
+                
+                # Check content type
+                content_type = response.headers.get('content-type', '')
+                logger.info(f"Content-Type: {content_type}")
+                logger.debug(f"Content-Encoding: {response.headers.get('content-encoding', 'identity')}")
+                
+                # Check if response is actually CSV
+                if 'text/csv' not in content_type and 'text/plain' not in content_type:
+                    logger.warning(f"⚠️  Unexpected content type: {content_type}, trying anyway...")
+                
+                # Save raw file
+                stream_to_file(response, filepath, DOWNLOAD_CHUNK_SIZE)
             
-            # Save raw file
-            filepath = self.output_dir / filename
-            filepath.write_bytes(response.content)
-            logger.info(f"✅ Saved: {filepath} ({len(response.content)} bytes)")
+            logger.info(f"✅ Saved: {filepath} ({filepath.stat().st_size} bytes)")
             
-            # Parse CSV
-            from io import StringIO
-            df = pd.read_csv(StringIO(response.text), encoding='utf-8', low_memory=False)
+            # Parse CSV from the saved file (no intermediate decoded str copy);
+            # this also refreshes the Parquet snapshot used on later runs
+            df = DataLoader.load_csv_snapshot(filepath, encoding='utf-8', **CSV_READ_KWARGS)
             logger.info(f"   Loaded {len(df)} rows, {len(df.columns)} columns")
             
             return df
@@ -293,32 +372,39 @@ class UNDataScraper:
             logger.error(traceback.format_exc())
             return None
     
-    def fetch_all(self, delay: float = 2.0) -> Dict[str, pd.DataFrame]:
+    def _fetch_many(self, datasets: List[Mapping[str, str]], max_workers: int) -> Dict[str, pd.DataFrame]:
+        """Fetch datasets concurrently over the shared session, keeping their order in the result"""
+        frames = {}
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self.fetch_dataset, ds['url'], ds['filename']): ds
+                for ds in datasets
+            }
+            # One progress bar (with ETA) instead of a line per dataset; failures are logged
+            for future in tqdm(as_completed(futures), total=len(futures), desc="UN datasets", unit="dataset"):
+                df = future.result()
+                if df is not None:
+                    frames[futures[future]['filename']] = df
+        
+        return {ds['filename']: frames[ds['filename']] for ds in datasets if ds['filename'] in frames}
+    
+    def fetch_all(self, max_workers: int = MAX_CONCURRENT_FETCHES) -> Dict[str, pd.DataFrame]:
         """
         Fetch all discovered datasets.
         
         Args:
-            delay: Delay between requests in seconds (be respectful to server)
+            max_workers: Maximum concurrent downloads (be respectful to server)
         
         Returns:
             Dictionary mapping filenames to DataFrames
         """
         datasets = self.discover_datasets()
-        results = {}
         
         print(f"\n📊 Found {len(datasets)} UN Data datasets")
         print("=" * 70)
         
-        for i, ds in enumerate(datasets, 1):
-            print(f"\n[{i}/{len(datasets)}] {ds['name']} ({ds['category']})")
-            
-            df = self.fetch_dataset(ds['url'], ds['filename'])
-            if df is not None:
-                results[ds['filename']] = df
-            
-            # Be respectful to the server
-            if i < len(datasets):
-                time.sleep(delay)
+        results = self._fetch_many(datasets, max_workers)
         
         print("\n" + "=" * 70)
         print(f"✅ Successfully fetched {len(results)}/{len(datasets)} datasets")
@@ -328,36 +414,25 @@ class UNDataScraper:
     
     def get_available_categories(self) -> List[str]:
         """Get list of all categories"""
-        datasets = self.discover_datasets()
-        categories = sorted(set(ds['category'] for ds in datasets))
-        return categories
+        return sorted(_DATASETS_BY_CATEGORY)
     
-    def fetch_by_category(self, category: str, delay: float = 2.0) -> Dict[str, pd.DataFrame]:
+    def fetch_by_category(self, category: str, max_workers: int = MAX_CONCURRENT_FETCHES) -> Dict[str, pd.DataFrame]:
         """
         Fetch all datasets in a specific category.
         
         Args:
             category: Category name (e.g., 'Economy', 'Health')
-            delay: Delay between requests
+            max_workers: Maximum concurrent downloads
         
         Returns:
             Dictionary mapping filenames to DataFrames
         """
-        datasets = [ds for ds in self.discover_datasets() if ds['category'] == category]
-        results = {}
+        datasets = list(_DATASETS_BY_CATEGORY.get(category, ()))
         
         print(f"\n📊 Fetching {len(datasets)} datasets from category: {category}")
         print("=" * 70)
         
-        for i, ds in enumerate(datasets, 1):
-            print(f"\n[{i}/{len(datasets)}] {ds['name']}")
-            
-            df = self.fetch_dataset(ds['url'], ds['filename'])
-            if df is not None:
-                results[ds['filename']] = df
-            
-            if i < len(datasets):
-                time.sleep(delay)
+        results = self._fetch_many(datasets, max_workers)
         
         print("\n" + "=" * 70)
         print(f"✅ Successfully fetched {len(results)}/{len(datasets)} datasets")
@@ -6,11 +6,17 @@ from langchain_core.documents import Document
 from langchain_openai import OpenAIEmbeddings
 from langchain_chroma import Chroma
 from langchain_community.vectorstores import FAISS
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores.utils import DistanceStrategy
 from langchain_core.vectorstores import VectorStore
 import logging
+import os
+import tempfile
+import numpy as np
 from pathlib import Path
 
 from ..config import Config
+from .embedding_cache import CachedEmbeddings
 
 logger = logging.getLogger(__name__)
 
@@ -22,17 +28,57 @@ class VectorStoreManager:
         self.store_type = store_type or Config.VECTOR_STORE_TYPE
         self.persist_path = persist_path or Config.VECTOR_STORE_PATH
         
-        # Initialize embeddings via OpenRouter (OpenAI API compatible)
-        self.embeddings = OpenAIEmbeddings(
-            model=Config.EMBEDDING_MODEL,
-            openai_api_key=Config.OPENROUTER_API_KEY,
-            openai_api_base=Config.OPENROUTER_BASE_URL
-        )
+        # Query embeddings are cached on disk across restarts and workers
+        self.embeddings = self._create_embeddings()
         self.vector_store: Optional[VectorStore] = None
+        # Set when the loaded FAISS index is a read-only memory map
+        self._faiss_mmapped = False
         
         # Create persist directory
         Path(self.persist_path).mkdir(parents=True, exist_ok=True)
     
+    @staticmethod
+    def _create_embeddings() -> CachedEmbeddings:
+        """Create the embedding model selected by Config.EMBEDDING_BACKEND."""
+        backend = Config.EMBEDDING_BACKEND
+        
+        if backend == "local":
+            from langchain_community.embeddings import HuggingFaceEmbeddings
+            
+            model_name = Config.LOCAL_EMBEDDING_MODEL
+            underlying = HuggingFaceEmbeddings(
+                model_name=model_name,
+                encode_kwargs={
+                    "normalize_embeddings": True,
+                    "batch_size": Config.EMBEDDING_BATCH_SIZE
+                }
+            )
+            logger.info(f"Using local embedding model {model_name}")
+            # The model already batches internally and runs in-process
+            concurrency = 1
+        
+        elif backend == "openrouter":
+            # Embeddings via OpenRouter (OpenAI API compatible)
+            model_name = Config.EMBEDDING_MODEL
+            underlying = OpenAIEmbeddings(
+                model=model_name,
+                openai_api_key=Config.OPENROUTER_API_KEY,
+                openai_api_base=Config.OPENROUTER_BASE_URL,
+                chunk_size=Config.EMBEDDING_BATCH_SIZE
+            )
+            concurrency = Config.EMBEDDING_CONCURRENCY
+        
+        else:
+            raise ValueError(f"Unsupported embedding backend: {backend}")
+        
+        return CachedEmbeddings(
+            underlying,
+            model_name=model_name,
+            cache_path=Config.EMBEDDING_CACHE_PATH,
+            batch_size=Config.EMBEDDING_BATCH_SIZE,
+            concurrency=concurrency
+        )
+    
     def create_vector_store(self, documents: List[Document], 
                            collection_name: str = "country_data",
                            batch_size: int = 5000) -> VectorStore:
@@ -77,12 +123,10 @@ class VectorStoreManager:
             logger.info(f"ChromaDB vector store created at {self.persist_path}")
         
         elif self.store_type == "faiss":
-            self.vector_store = FAISS.from_documents(
-                documents=documents,
-                embedding=self.embeddings
-            )
+            self.vector_store = self._build_faiss_store(documents)
+            self._faiss_mmapped = False
             # Save FAISS index
-            self.vector_store.save_local(self.persist_path)
+            self._save_faiss_store()
             logger.info(f"FAISS vector store created at {self.persist_path}")
         
         else:
@@ -90,12 +134,13 @@ class VectorStoreManager:
         
         return self.vector_store
     
-    def load_vector_store(self, collection_name: str = "country_data") -> VectorStore:
+    def load_vector_store(self, collection_name: str = "country_data", mmap: bool = True) -> VectorStore:
         """
         Load existing vector store.
         
         Args:
             collection_name: Name of the collection
+            mmap: Memory-map the FAISS index read-only instead of reading it into RAM
         """
         logger.info(f"Loading {self.store_type} vector store from {self.persist_path}")
         
@@ -107,11 +152,8 @@ class VectorStoreManager:
             )
         
         elif self.store_type == "faiss":
-            self.vector_store = FAISS.load_local(
-                self.persist_path,
-                self.embeddings,
-                allow_dangerous_deserialization=True
-            )
+            self.vector_store = self._load_faiss_store(mmap)
+            self._faiss_mmapped = mmap
         
         else:
             raise ValueError(f"Unsupported vector store type: {self.store_type}")
@@ -119,6 +161,115 @@ class VectorStoreManager:
         logger.info("Vector store loaded successfully")
         return self.vector_store
     
+    def _build_faiss_store(self, documents: List[Document]) -> FAISS:
+        """
+        Build a FAISS store over L2-normalised embeddings, so inner product equals cosine.
+        
+        Uses an exact IndexFlatIP, an IndexIVFPQ when Config.FAISS_INDEX_TYPE
+        is "ivfpq" and there are enough vectors to train it, or an IndexHNSWSQ
+        over int8 scalar-quantised vectors when it is "hnswsq".
+        """
+        import faiss
+        
+        texts = [doc.page_content for doc in documents]
+        metadatas = [doc.metadata for doc in documents]
+        
+        vectors = np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32)
+        faiss.normalize_L2(vectors)
+        dim = vectors.shape[1]
+        
+        index_type = Config.FAISS_INDEX_TYPE
+        # 8-bit PQ codebooks need at least 256 training vectors
+        if index_type == "ivfpq" and len(vectors) < 256:
+            logger.warning(f"⚠️ Only {len(vectors)} vectors, too few to train IVFPQ; using a flat index")
+            index_type = "flat"
+        
+        if index_type == "ivfpq":
+            # FAISS wants ~39 training points per list; shrink nlist for smaller corpora
+            nlist = max(1, min(Config.FAISS_NLIST, len(vectors) // 39))
+            quantizer = faiss.IndexFlatIP(dim)
+            index = faiss.IndexIVFPQ(quantizer, dim, nlist, Config.FAISS_PQ_M, 8, faiss.METRIC_INNER_PRODUCT)
+            logger.info(f"Training IndexIVFPQ (nlist={nlist}, m={Config.FAISS_PQ_M}) on {len(vectors)} vectors")
+            index.train(vectors)
+            index.nprobe = Config.FAISS_NPROBE
+        elif index_type == "hnswsq":
+            # SQ8 training only learns per-dimension value ranges, so any corpus size works
+            index = faiss.IndexHNSWSQ(dim, faiss.ScalarQuantizer.QT_8bit, Config.FAISS_HNSW_M,
+                                      faiss.METRIC_INNER_PRODUCT)
+            logger.info(f"Training IndexHNSWSQ (M={Config.FAISS_HNSW_M}, int8) on {len(vectors)} vectors")
+            index.train(vectors)
+            index.hnsw.efSearch = Config.FAISS_EF_SEARCH
+        elif index_type == "flat":
+            index = faiss.IndexFlatIP(dim)
+        else:
+            raise ValueError(f"Unsupported FAISS index type: {index_type}")
+        
+        store = FAISS(
+            embedding_function=self.embeddings,
+            index=index,
+            docstore=InMemoryDocstore(),
+            index_to_docstore_id={},
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT,
+            normalize_L2=True
+        )
+        store.add_embeddings(zip(texts, vectors.tolist()), metadatas=metadatas)
+        return store
+    
+    def _load_faiss_store(self, mmap: bool) -> FAISS:
+        """
+        Load the FAISS index and docstore written by save_local.
+        
+        With mmap, the vector codes stay on disk and the OS pages them in on
+        demand: IO_FLAG_MMAP covers IVF inverted lists, IO_FLAG_MMAP_IFC the
+        codes of flat and HNSW storage (faiss >= 1.11; older versions read
+        those into RAM). Graph and quantizer structures are always loaded.
+        """
+        import faiss
+        import pickle
+        
+        folder = Path(self.persist_path)
+        io_flags = 0
+        if mmap:
+            io_flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY | getattr(faiss, "IO_FLAG_MMAP_IFC", 0)
+        index = faiss.read_index(str(folder / "index.faiss"), io_flags)
+        
+        # Same pickle FAISS.load_local reads; it is written only by our own save_local
+        with open(folder / "index.pkl", "rb") as f:
+            docstore, index_to_docstore_id = pickle.load(f)
+        
+        if index.metric_type != faiss.METRIC_INNER_PRODUCT:
+            # Index saved before the inner-product switch: keep L2 scoring for it
+            logger.warning("⚠️ FAISS index uses L2 distance; rebuild the vector store to use inner product")
+            return FAISS(
+                embedding_function=self.embeddings,
+                index=index,
+                docstore=docstore,
+                index_to_docstore_id=index_to_docstore_id
+            )
+        
+        return FAISS(
+            embedding_function=self.embeddings,
+            index=index,
+            docstore=docstore,
+            index_to_docstore_id=index_to_docstore_id,
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT,
+            normalize_L2=True
+        )
+    
+    def _save_faiss_store(self) -> None:
+        """
+        Save the FAISS store, swapping the files in atomically.
+        
+        Other processes (API workers, ingest runs) may have index.faiss memory-mapped;
+        rewriting it in place would corrupt their view, while os.replace leaves them
+        reading the old inode until they reload.
+        """
+        folder = Path(self.persist_path)
+        with tempfile.TemporaryDirectory(dir=folder, prefix=".save-") as tmp_dir:
+            self.vector_store.save_local(tmp_dir)
+            for name in ("index.faiss", "index.pkl"):
+                os.replace(Path(tmp_dir) / name, folder / name)
+    
     def add_documents(self, documents: List[Document], batch_size: int = 5000) -> None:
         """Add documents to existing vector store in batches
         
@@ -129,6 +280,12 @@ class VectorStoreManager:
         if self.vector_store is None:
             raise ValueError("Vector store not initialized. Create or load first.")
         
+        if self._faiss_mmapped:
+            # A read-only memory map cannot grow; switch to an in-RAM copy first
+            logger.info("Reloading memory-mapped FAISS index into RAM for writing")
+            self.vector_store = self._load_faiss_store(mmap=False)
+            self._faiss_mmapped = False
+        
         total_docs = len(documents)
         
         # Process in batches if needed
@@ -143,7 +300,7 @@ class VectorStoreManager:
         
         # ChromaDB auto-persists in langchain-chroma, FAISS needs manual save
         if self.store_type == "faiss":
-            self.vector_store.save_local(self.persist_path)
+            self._save_faiss_store()
         
         logger.info(f"Added {len(documents)} documents to vector store")
     
@@ -11,6 +11,24 @@ from typing import Optional
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# ISO3-style codes the API uses for regions, income groups and lending groups
+AGGREGATE_CODES = frozenset({
+    "AFE", "AFW", "ARB", "CEB", "CSS", "EAP", "EAR", "EAS", "ECA", "ECS",
+    "EMU", "EUU", "FCS", "HIC", "HPC", "IBD", "IBT", "IDA", "IDB", "IDX",
+    "INX", "LAC", "LCN", "LDC", "LIC", "LMC", "LMY", "LTE", "MEA", "MIC",
+    "MNA", "NAC", "OED", "OSS", "PRE", "PSS", "PST", "SAS", "SSA", "SSF",
+    "SST", "TEA", "TEC", "TLA", "TMN", "TSA", "TSS", "UMC", "WLD",
+})
+
+# Flattened API fields kept in the output, mapped to their column names
+RECORD_COLUMNS = {
+    'country.value': 'country',
+    'countryiso3code': 'country_code',
+    'indicator.value': 'indicator',
+    'date': 'year',
+    'value': 'value',
+}
+
 
 class WorldBankFetcher:
     """Fetch data from World Bank Open Data API"""
@@ -62,24 +80,18 @@ class WorldBankFetcher:
             
             records = data[1]
             
-            # Convert to DataFrame
-            df = pd.DataFrame([
-                {
-                    'country': record.get('country', {}).get('value'),
-                    'country_code': record.get('countryiso3code'),
-                    'indicator': record.get('indicator', {}).get('value'),
-                    'indicator_code': indicator_code,
-                    'year': record.get('date'),
-                    'value': record.get('value')
-                }
-                for record in records
-                if record.get('value') is not None
-            ])
+            # Convert to DataFrame, flattening the nested country/indicator objects
+            df = pd.json_normalize(records)[list(RECORD_COLUMNS)].rename(columns=RECORD_COLUMNS)
+            df.insert(3, 'indicator_code', indicator_code)
             
             # Remove aggregates (regions, income groups, etc.)
             # Keep only actual countries (3-letter ISO codes that are not aggregates)
-            df = df[df['country_code'].notna()]
-            df = df[~df['country'].str.contains('income|World|IDA|IBRD', case=False, na=False)]
+            is_country = (
+                df['country_code'].notna()
+                & (df['country_code'] != '')
+                & ~df['country_code'].isin(AGGREGATE_CODES)
+            )
+            df = df[is_country & df['value'].notna()]
             
             logger.info(f"Loaded {len(df)} records for {len(df['country'].unique())} countries")
             
@@ -11,6 +11,7 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from src.config import Config
 from src.data_ingestion import DataLoader, DocumentProcessor, VectorStoreManager
+from src.data_ingestion.processor import DATAFRAME_CHUNK_ROWS, batched
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -130,24 +131,27 @@ def ingest_data(file_path: str, text_columns: list = None, chunk_size: int = 100
             # JSON data
             documents = processor.process_json(data, base_metadata=base_metadata)
         else:
-            # DataFrame
-            documents = processor.process_dataframe(
+            # DataFrame: documents are generated lazily, one per row
+            documents = processor.iter_documents(
                 data,
                 text_columns=text_columns,
                 base_metadata=base_metadata
             )
         
-        logger.info(f"Processed {len(documents)} documents")
+        logger.info(f"Processed {len(data)} documents")
         
         # Create or update vector store
         try:
             logger.info("Attempting to load existing vector store...")
             vector_store_manager.load_vector_store()
-            logger.info("Adding documents to existing vector store")
-            vector_store_manager.add_documents(documents)
         except Exception as e:
             logger.info(f"Creating new vector store: {str(e)}")
-            vector_store_manager.create_vector_store(documents)
+            # A new store is built from the full set (FAISS trains its index on it)
+            vector_store_manager.create_vector_store(list(documents))
+        else:
+            logger.info("Adding documents to existing vector store")
+            for batch in batched(documents, DATAFRAME_CHUNK_ROWS):
+                vector_store_manager.add_documents(batch)
         
         logger.info("✅ Data ingestion completed successfully!")
         logger.info(f"Vector store location: {Config.VECTOR_STORE_PATH}")
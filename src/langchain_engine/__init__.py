@@ -1,4 +1,4 @@
 """LangChain engine package"""
-from .enhanced_query_engine import EnhancedQueryEngine
+from .enhanced_query_engine import EnhancedQueryEngine, QUERY_ERROR_PREFIX, iter_answer_chunks
 
-__all__ = ['EnhancedQueryEngine']
+__all__ = ['EnhancedQueryEngine', 'QUERY_ERROR_PREFIX', 'iter_answer_chunks']
@@ -1,16 +1,20 @@
 """
 Enhanced query engine with decision support capabilities.
 """
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Tuple, AsyncIterator, Iterator
 from langchain_openai import ChatOpenAI
 from langchain_classic.agents import create_react_agent, AgentExecutor
 from langchain_core.prompts import PromptTemplate, ChatPromptTemplate
 from langchain_core.tools import Tool
 from langchain_core.output_parsers import PydanticOutputParser
 from pydantic import BaseModel, Field
+import asyncio
 import logging
 import re
 
+import httpx
+import openai
+
 from ..config import Config
 from ..data_ingestion.vector_store import VectorStoreManager
 from ..tools.decision_support import decision_support_tool
@@ -22,6 +26,32 @@ from ..tools.map_registry import MapRegistry
 
 logger = logging.getLogger(__name__)
 
+# Prefix of the answer returned when query() swallows an exception
+QUERY_ERROR_PREFIX = "I encountered an error while processing your request"
+
+# Expected failures from the LLM provider (timeouts, rate limits, 5xx)
+UPSTREAM_ERRORS = (openai.APIError, httpx.TimeoutException)
+
+
+def iter_answer_chunks(answer: str) -> Iterator[str]:
+    """Split an answer into paragraph deltas, keeping any MAP: payload whole as the last one."""
+    text_part, sep, map_part = answer.partition("MAP:")
+    paragraphs = text_part.split("\n\n")
+    for i, paragraph in enumerate(paragraphs):
+        delta = paragraph if i == len(paragraphs) - 1 else paragraph + "\n\n"
+        if delta:
+            yield delta
+    if sep:
+        yield sep + map_part
+
+
+def _log_query_error(e: Exception) -> None:
+    """Log a failed query; tracebacks only for unexpected errors, not upstream flaps."""
+    if isinstance(e, UPSTREAM_ERRORS):
+        logger.warning(f"⚠️ Upstream LLM error in query: {type(e).__name__}: {e}")
+    else:
+        logger.error(f"Error in query: {e}", exc_info=True)
+
 # PMESII domain keywords
 PMESII_DOMAINS = {
     "political": ["political", "politics", "government", "governance", "parliament", "elections", "diplomacy"],
@@ -457,164 +487,252 @@ Thought: {agent_scratchpad}"""
             The answer (may contain MAP: prefix for maps)
         """
         try:
-            # Check if this is a map request - if so, call the tool directly
-            map_keywords = ['map', 'plot', 'visualize', 'show me', 'display']
-            location_keywords = ['ethnic', 'groups', 'territories', 'epr', 'geoepr']
-            
-            question_lower = question.lower()
-            is_map_request = (
-                any(keyword in question_lower for keyword in map_keywords) and
-                any(keyword in question_lower for keyword in location_keywords)
-            )
+            direct_answer = self._answer_directly(question)
+            if direct_answer is not None:
+                return direct_answer
+            
+            # Regular agent execution for non-map queries
+            result = self.agent_executor.invoke({"input": question})
+            return self._finalize_agent_output(result)
+            
+        except Exception as e:
+            _log_query_error(e)
+            return f"{QUERY_ERROR_PREFIX}: {str(e)}"
+    
+    async def aquery(self, question: str) -> str:
+        """
+        Async variant of query().
+        
+        The direct PMESII/infrastructure/map paths run in a worker thread, the
+        agent itself runs through AgentExecutor.ainvoke so the LLM calls are
+        awaited instead of blocking a threadpool slot.
+        
+        Args:
+            question: The user's question
+            
+        Returns:
+            The answer (may contain MAP: prefix for maps)
+        """
+        try:
+            direct_answer = await asyncio.to_thread(self._answer_directly, question)
+            if direct_answer is not None:
+                return direct_answer
+            
+            result = await self.agent_executor.ainvoke({"input": question})
+            return self._finalize_agent_output(result)
+            
+        except Exception as e:
+            _log_query_error(e)
+            return f"{QUERY_ERROR_PREFIX}: {str(e)}"
+    
+    async def astream(self, question: str) -> AsyncIterator[Dict[str, str]]:
+        """
+        Stream progress and the answer for a question.
+        
+        The ReAct agent's raw LLM tokens contain its scratchpad and the final
+        output is post-processed (citations restored, map IDs resolved), so
+        tokens are not forwarded as-is. Instead this yields a status event for
+        every tool call while the agent runs, then the finished answer in
+        paragraph-sized deltas (a map is always sent as one delta).
+        
+        Args:
+            question: The user's question
+            
+        Yields:
+            {"status": ...} progress events and {"delta": ...} answer chunks
+        """
+        try:
+            yield {"status": "Analyzing your query..."}
+            
+            direct_answer = await asyncio.to_thread(self._answer_directly, question)
+            if direct_answer is not None:
+                answer = direct_answer
+            else:
+                output = ""
+                intermediate_steps = []
+                async for chunk in self.agent_executor.astream({"input": question}):
+                    for action in chunk.get("actions", []):
+                        yield {"status": f"Using {action.tool}..."}
+                    for step in chunk.get("steps", []):
+                        intermediate_steps.append((step.action, step.observation))
+                    if "output" in chunk:
+                        output = chunk["output"]
+                
+                answer = self._finalize_agent_output({
+                    "output": output,
+                    "intermediate_steps": intermediate_steps
+                })
+        
+        except Exception as e:
+            _log_query_error(e)
+            answer = f"{QUERY_ERROR_PREFIX}: {str(e)}"
+        
+        for delta in iter_answer_chunks(answer):
+            yield {"delta": delta}
+    
+    def _answer_directly(self, question: str) -> Optional[str]:
+        """
+        Handle PMESII, infrastructure and map requests without the agent.
+        
+        Returns:
+            The answer, or None if the question should go to the agent
+        """
+        # Check if this is a map request - if so, call the tool directly
+        map_keywords = ['map', 'plot', 'visualize', 'show me', 'display']
+        location_keywords = ['ethnic', 'groups', 'territories', 'epr', 'geoepr']
+        
+        question_lower = question.lower()
+        is_map_request = (
+            any(keyword in question_lower for keyword in map_keywords) and
+            any(keyword in question_lower for keyword in location_keywords)
+        )
+        
+        # Check for PMESII analysis queries
+        pmesii_trigger = self._detect_pmesii_query(question)
+        if pmesii_trigger:
+            country, domain = pmesii_trigger
+            logger.info(f"Detected PMESII query for {country}, domain: {domain or 'all'}")
+            try:
+                result = self._perform_pmesii_analysis(country, domain)
+                return result
+            except Exception as e:
+                logger.error(f"Error in PMESII analysis: {e}", exc_info=True)
+                # Fall through to regular agent handling
+        
+        # Check for infrastructure queries
+        infrastructure_keywords = ['infrastructure', 'cisi', 'critical infrastructure']
+        is_infrastructure_request = any(keyword in question_lower for keyword in infrastructure_keywords)
+        
+        if is_infrastructure_request:
+            # Extract country name
+            import re
+            patterns = [
+                r'(?:in|of|for)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)',
+                r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)\s+infrastructure',
+                r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)\s*$',
+            ]
+            
+            country = None
+            for pattern in patterns:
+                match = re.search(pattern, question)
+                if match:
+                    country = match.group(1)
+                    break
             
-            # Check for PMESII analysis queries
-            pmesii_trigger = self._detect_pmesii_query(question)
-            if pmesii_trigger:
-                country, domain = pmesii_trigger
-                logger.info(f"Detected PMESII query for {country}, domain: {domain or 'all'}")
+            if country:
+                logger.info(f"Detected infrastructure request for country: {country}")
                 try:
-                    result = self._perform_pmesii_analysis(country, domain)
+                    from ..tools.cisi_tool import analyze_critical_infrastructure
+                    result = analyze_critical_infrastructure.invoke({"country": country, "max_hotspots": 10})
+                    
+                    # Resolve MAP_ID if present
+                    if "MAP_ID:" in result:
+                        parts = result.split("MAP_ID:")
+                        map_id = parts[1].strip()
+                        html = MapRegistry.get_map(map_id)
+                        if html:
+                            return f"{parts[0].strip()}\n\nMAP:{html}"
+                    
                     return result
                 except Exception as e:
-                    logger.error(f"Error in PMESII analysis: {e}", exc_info=True)
+                    logger.error(f"Error analyzing infrastructure: {e}", exc_info=True)
                     # Fall through to regular agent handling
+        
+        if is_map_request:
+            # Extract country name (simple approach)
+            import re
+            # Common pattern: "map of X" or "ethnic groups in X"
+            patterns = [
+                r'(?:in|of|for)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)',  # "in Nigeria", "of Mali"
+                r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)\s+ethnic',  # "Nigeria ethnic groups"
+                r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)\s*$',  # Country at end
+            ]
             
-            # Check for infrastructure queries
-            infrastructure_keywords = ['infrastructure', 'cisi', 'critical infrastructure']
-            is_infrastructure_request = any(keyword in question_lower for keyword in infrastructure_keywords)
-            
-            if is_infrastructure_request:
-                # Extract country name
-                import re
-                patterns = [
-                    r'(?:in|of|for)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)',
-                    r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)\s+infrastructure',
-                    r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)\s*$',
-                ]
-                
-                country = None
-                for pattern in patterns:
-                    match = re.search(pattern, question)
-                    if match:
-                        country = match.group(1)
-                        break
-                
-                if country:
-                    logger.info(f"Detected infrastructure request for country: {country}")
-                    try:
-                        from ..tools.cisi_tool import analyze_critical_infrastructure
-                        result = analyze_critical_infrastructure.invoke({"country": country, "max_hotspots": 10})
-                        
-                        # Resolve MAP_ID if present
-                        if "MAP_ID:" in result:
-                            parts = result.split("MAP_ID:")
-                            map_id = parts[1].strip()
-                            html = MapRegistry.get_map(map_id)
-                            if html:
-                                return f"{parts[0].strip()}\n\nMAP:{html}"
-                        
-                        return result
-                    except Exception as e:
-                        logger.error(f"Error analyzing infrastructure: {e}", exc_info=True)
-                        # Fall through to regular agent handling
+            country = None
+            for pattern in patterns:
+                match = re.search(pattern, question)
+                if match:
+                    country = match.group(1)
+                    break
             
-            if is_map_request:
-                # Extract country name (simple approach)
-                import re
-                # Common pattern: "map of X" or "ethnic groups in X"
-                patterns = [
-                    r'(?:in|of|for)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)',  # "in Nigeria", "of Mali"
-                    r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)\s+ethnic',  # "Nigeria ethnic groups"
-                    r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)\s*$',  # Country at end
-                ]
-                
-                country = None
-                for pattern in patterns:
-                    match = re.search(pattern, question)
-                    if match:
-                        country = match.group(1)
-                        break
-                
-                if country:
-                    logger.info(f"Detected map request for country: {country}")
-                    # Call the plot tool directly
-                    try:
-                        from ..tools.geoepr_tool import plot_geoepr_map
-                        map_result = plot_geoepr_map.invoke({"country": country, "plot_type": "country"})
-                        
-                        # Resolve MAP_ID if present
-                        if "MAP_ID:" in map_result:
-                            parts = map_result.split("MAP_ID:")
-                            map_id = parts[1].strip()
-                            html = MapRegistry.get_map(map_id)
-                            if html:
-                                map_result = f"MAP:{html}"
-                        
-                        # Generate contextual explanation
-                        context_prompt = f"""Provide a brief 2-3 sentence introduction for a map showing ethnic groups in {country}.
+            if country:
+                logger.info(f"Detected map request for country: {country}")
+                # Call the plot tool directly
+                try:
+                    from ..tools.geoepr_tool import plot_geoepr_map
+                    map_result = plot_geoepr_map.invoke({"country": country, "plot_type": "country"})
+                    
+                    # Resolve MAP_ID if present
+                    if "MAP_ID:" in map_result:
+                        parts = map_result.split("MAP_ID:")
+                        map_id = parts[1].strip()
+                        html = MapRegistry.get_map(map_id)
+                        if html:
+                            map_result = f"MAP:{html}"
+                    
+                    # Generate contextual explanation
+                    context_prompt = f"""Provide a brief 2-3 sentence introduction for a map showing ethnic groups in {country}.
 Mention major ethnic groups if you know them, and note the political significance of ethnic diversity in this country."""
+                    
+                    context = self.llm.invoke(context_prompt).content
+                    
+                    # Return map with context
+                    return f"{context}\n\n{map_result}"
+                except Exception as e:
+                    logger.error(f"Error generating map: {e}", exc_info=True)
+                    # Fall through to regular agent handling
+        
+        return None
+    
+    def _finalize_agent_output(self, result: Dict[str, Any]) -> str:
+        """Restore citations and resolve map IDs in the agent's output."""
+        output = result["output"]
+        
+        # CRITICAL: Check if knowledge_base_search was used and preserve citations
+        if "intermediate_steps" in result:
+            for action, observation in result["intermediate_steps"]:
+                if isinstance(observation, str):
+                    # If knowledge_base_search was used and returned citations
+                    if hasattr(action, 'tool') and action.tool == "knowledge_base_search":
+                        logger.info(f"Found knowledge_base_search observation. Has References: {'References' in observation}")
+                        logger.info(f"Output has References: {'References' in output}")
+                        logger.info(f"Observation has citations: {'<sup>[' in observation}")
+                        logger.info(f"Output has citations: {'<sup>[' in output}")
                         
-                        context = self.llm.invoke(context_prompt).content
-                        
-                        # Return map with context
-                        return f"{context}\n\n{map_result}"
-                    except Exception as e:
-                        logger.error(f"Error generating map: {e}", exc_info=True)
-                        # Fall through to regular agent handling
-            
-            # Regular agent execution for non-map queries
-            result = self.agent_executor.invoke({"input": question})
-            output = result["output"]
-            
-            # CRITICAL: Check if knowledge_base_search was used and preserve citations
-            if "intermediate_steps" in result:
-                for action, observation in result["intermediate_steps"]:
-                    if isinstance(observation, str):
-                        # If knowledge_base_search was used and returned citations
-                        if hasattr(action, 'tool') and action.tool == "knowledge_base_search":
-                            logger.info(f"Found knowledge_base_search observation. Has References: {'References' in observation}")
-                            logger.info(f"Output has References: {'References' in output}")
-                            logger.info(f"Observation has citations: {'<sup>[' in observation}")
-                            logger.info(f"Output has citations: {'<sup>[' in output}")
-                            
-                            if "References" in observation:
-                                # Check if the output lost the references
-                                if "References" not in output:
-                                    # Agent removed citations! Use the original observation instead
-                                    logger.warning("Agent removed citations from knowledge_base_search output. Using original observation.")
-                                    output = observation
-                                    break
-                                elif "<sup>[" in observation and "<sup>[" not in output:
-                                    # Agent removed inline citations! Use the original observation
-                                    logger.warning("Agent removed inline citations. Using original observation.")
-                                    output = observation
-                                    break
-            
-            # Check for MAP_ID in output
-            if "MAP_ID:" in output:
-                parts = output.split("MAP_ID:")
-                map_id = parts[1].strip()
-                html = MapRegistry.get_map(map_id)
-                if html:
-                    return f"{parts[0].strip()}\n\nMAP:{html}"
-            
-            # Check if any tool returned a map by looking at intermediate steps
-            if "intermediate_steps" in result:
-                for action, observation in result["intermediate_steps"]:
-                    if isinstance(observation, str):
-                        # Check for MAP_ID in observation
-                        if "MAP_ID:" in observation:
-                            parts = observation.split("MAP_ID:")
-                            map_id = parts[1].strip()
-                            html = MapRegistry.get_map(map_id)
-                            if html:
-                                return f"{output}\n\nMAP:{html}"
-            
-            return output
-            
-        except Exception as e:
-            logger.error(f"Error in query: {e}", exc_info=True)
-            return f"I encountered an error while processing your request: {str(e)}"
+                        if "References" in observation:
+                            # Check if the output lost the references
+                            if "References" not in output:
+                                # Agent removed citations! Use the original observation instead
+                                logger.warning("Agent removed citations from knowledge_base_search output. Using original observation.")
+                                output = observation
+                                break
+                            elif "<sup>[" in observation and "<sup>[" not in output:
+                                # Agent removed inline citations! Use the original observation
+                                logger.warning("Agent removed inline citations. Using original observation.")
+                                output = observation
+                                break
+        
+        # Check for MAP_ID in output
+        if "MAP_ID:" in output:
+            parts = output.split("MAP_ID:")
+            map_id = parts[1].strip()
+            html = MapRegistry.get_map(map_id)
+            if html:
+                return f"{parts[0].strip()}\n\nMAP:{html}"
+        
+        # Check if any tool returned a map by looking at intermediate steps
+        if "intermediate_steps" in result:
+            for action, observation in result["intermediate_steps"]:
+                if isinstance(observation, str):
+                    # Check for MAP_ID in observation
+                    if "MAP_ID:" in observation:
+                        parts = observation.split("MAP_ID:")
+                        map_id = parts[1].strip()
+                        html = MapRegistry.get_map(map_id)
+                        if html:
+                            return f"{output}\n\nMAP:{html}"
+        
+        return output
     
     def _detect_pmesii_query(self, question: str) -> Optional[tuple]:
         """Detect if query is asking for PMESII analysis.
@@ -693,12 +811,8 @@ Mention major ethnic groups if you know them, and note the political significanc
             Analysis result string
         """
         try:
-            import sys
-            from pathlib import Path
-            sys.path.append(str(Path(__file__).parent.parent.parent / "scripts"))
-            
-            from list_indicators import extract_indicators_from_un_data
-            from pmesii_analysis import group_indicators_by_pmesii
+            from scripts.list_indicators import extract_indicators_from_un_data
+            from scripts.pmesii_analysis import group_indicators_by_pmesii
             
             logger.info(f"Performing PMESII analysis for {country}, domain: {domain or 'all'}")
             
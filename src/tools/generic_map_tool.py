@@ -12,6 +12,7 @@ from shapely.geometry import Point
 import pandas as pd
 
 from .map_registry import MapRegistry
+from ..analysis.country_bounds import get_country_bounds
 
 logger = logging.getLogger(__name__)
 
@@ -74,22 +75,7 @@ def _get_country_bounds(country_name: str) -> Optional[tuple]:
     Returns:
         Tuple of (minx, miny, maxx, maxy) or None
     """
-    try:
-        url = "https://naciscdn.org/naturalearth/110m/cultural/ne_110m_admin_0_countries.zip"
-        world = gpd.read_file(url)
-        
-        country = world[
-            (world['NAME'].str.lower() == country_name.lower()) |
-            (world['NAME_LONG'].str.lower() == country_name.lower()) |
-            (world['ADMIN'].str.lower() == country_name.lower())
-        ]
-        
-        if not country.empty:
-            return tuple(country.total_bounds)
-    except Exception as e:
-        logger.error(f"Error getting bounds for {country_name}: {e}")
-    
-    return None
+    return get_country_bounds(country_name)
 
 
 def _get_major_cities(country_name: str) -> Optional[List[str]]:
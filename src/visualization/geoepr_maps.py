@@ -9,6 +9,8 @@ from pathlib import Path
 import logging
 from typing import Optional, List
 
+from ..data_ingestion.geoepr_scraper import SHAPEFILE_READ_KWARGS
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -35,7 +37,7 @@ class GeoEPRVisualizer:
             return False
         
         try:
-            self.gdf = gpd.read_file(shp_files[0])
+            self.gdf = gpd.read_file(shp_files[0], **SHAPEFILE_READ_KWARGS)
             logger.info(f"✅ Loaded {len(self.gdf)} ethnic group polygons")
             
             # Convert to WGS84 for web mapping
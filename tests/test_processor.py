@@ -0,0 +1,120 @@
+"""
+Tests for DataFrame to Document conversion in DocumentProcessor.
+
+Expected values are those of the original row-by-row (iterrows) conversion,
+which stored the hints as a comma-separated "content_hints" string.
+"""
+import pytest
+
+pd = pytest.importorskip("pandas")
+# The data_ingestion package imports the loader and vector store dependencies too
+processor = pytest.importorskip("src.data_ingestion.processor")
+
+DocumentProcessor = processor.DocumentProcessor
+mask_to_names = processor.mask_to_names
+
+
+BASE_METADATA = {"source_name": "test", "source_year": "2024"}
+
+EXPECTED = [
+    {
+        "page_content": "country: Mali\nindicator: GDP growth\nvalue: 5.2\nyear: 2020",
+        "hints": ["economic"],
+        "metadata": {
+            "source_name": "test",
+            "source_year": "2024",
+            "row_id": 10,
+            "doc_id": "test_10",
+            "countries": "Mali",
+            "country": "Mali",
+            "indicator": "GDP growth",
+            "value": "5.2",
+            "year": "2020",
+        },
+    },
+    {
+        "page_content": "country: Chad\nindicator: Population\nyear: 2021\nnotes: Ethnic group data",
+        "hints": ["demographic", "ethnic"],
+        "metadata": {
+            "source_name": "test",
+            "source_year": "2024",
+            "row_id": 11,
+            "doc_id": "test_11",
+            "countries": "Chad",
+            "country": "Chad",
+            "indicator": "Population",
+            "year": "2021",
+            "notes": "Ethnic group data",
+        },
+    },
+    {
+        "page_content": "indicator: Armed forces personnel\nvalue: 12000.5\nyear: 2022\nnotes: war and crisis",
+        "hints": ["conflict", "military"],
+        "metadata": {
+            "source_name": "test",
+            "source_year": "2024",
+            "row_id": 12,
+            "doc_id": "test_12",
+            "indicator": "Armed forces personnel",
+            "value": "12000.5",
+            "year": "2022",
+            "notes": "war and crisis",
+        },
+    },
+    {
+        "page_content": "country: Peru\nindicator: Rainfall\nyear: 2023",
+        "hints": ["general"],
+        "metadata": {
+            "source_name": "test",
+            "source_year": "2024",
+            "row_id": 13,
+            "doc_id": "test_13",
+            "countries": "Peru",
+            "country": "Peru",
+            "indicator": "Rainfall",
+            "year": "2023",
+        },
+    },
+]
+
+
+@pytest.fixture
+def country_frame():
+    """Mixed-dtype rows with nulls, a country column and hint keywords"""
+    return pd.DataFrame(
+        {
+            "country": ["Mali", "Chad", None, "Peru"],
+            "indicator": ["GDP growth", "Population", "Armed forces personnel", "Rainfall"],
+            "value": [5.2, None, 12000.5, None],
+            "year": [2020, 2021, 2022, 2023],
+            "notes": [None, "Ethnic group data", "war and crisis", None],
+        },
+        index=[10, 11, 12, 13],
+    )
+
+
+@pytest.mark.parametrize("chunk_rows", [512, 3, 1])
+def test_iter_documents_matches_row_conversion(country_frame, chunk_rows):
+    documents = list(DocumentProcessor().iter_documents(
+        country_frame, base_metadata=BASE_METADATA, chunk_rows=chunk_rows
+    ))
+
+    assert len(documents) == len(EXPECTED)
+    for document, expected in zip(documents, EXPECTED):
+        metadata = dict(document.metadata)
+        assert document.page_content == expected["page_content"]
+        assert mask_to_names(metadata.pop("content_hints_mask")) == expected["hints"]
+        assert metadata == expected["metadata"]
+
+
+def test_iter_documents_limits_countries_to_three():
+    df = pd.DataFrame({
+        "country": ["Mali"],
+        "nation": ["Chad"],
+        "state_name": ["Niger"],
+        "partner_country": ["Peru"],
+    })
+
+    document = next(DocumentProcessor().iter_documents(df, base_metadata=BASE_METADATA))
+
+    assert document.metadata["countries"] == "Mali,Chad,Niger"
@@ -0,0 +1,39 @@
+"""
+Tests for the /query/stream server-sent event route.
+"""
+import json
+
+import pytest
+
+pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient
+
+from src.api import server
+
+
+def _stream_events(client: TestClient, question: str) -> list:
+    response = client.post("/query/stream", json={"question": question})
+    assert response.status_code == 200
+    return [
+        json.loads(line[len("data: "):])
+        for line in response.text.splitlines()
+        if line.startswith("data: ")
+    ]
+
+
+def test_cached_map_answer_streams_map_as_own_delta(monkeypatch):
+    """A cached map answer must reach the dashboard as a separate MAP: delta"""
+    question = "Show a map of ethnic groups in Mali"
+    answer = "Ethnic groups in Mali.\n\nSources below.\n\nMAP:<iframe srcdoc='map'></iframe>"
+    
+    # Any non-None engine passes the 503 check; a cache hit never calls it
+    monkeypatch.setattr(server, "query_engine", object())
+    monkeypatch.setitem(server._answer_cache, server._answer_cache_key(question, None), answer)
+    
+    events = _stream_events(TestClient(server.app), question)
+    deltas = [event["delta"] for event in events if "delta" in event]
+    
+    assert deltas[-1] == "MAP:<iframe srcdoc='map'></iframe>"
+    assert not any("MAP:" in delta for delta in deltas[:-1])
+    assert "".join(deltas) == answer
+    assert events[-1] == {"done": True}